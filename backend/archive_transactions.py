@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Move transactions older than the configured horizon to the archive tier
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from database import connect_to_mongo, close_mongo_connection, create_indexes, get_database
+from config import settings
+from utils.archive import archive_transactions
+
+
+async def main(days: int, batch_size: int):
+    await connect_to_mongo()
+    await create_indexes()
+    try:
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        print(f"Archiving transactions older than {cutoff:%Y-%m-%d %H:%M} UTC...")
+        moved = await archive_transactions(get_database(), cutoff, batch_size=batch_size)
+        print(f"✅ Archived {moved} transactions")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=settings.transaction_archive_after_days,
+                        help="archive entries older than this many days")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.batch_size))
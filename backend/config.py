@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from datetime import datetime
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -8,7 +9,97 @@ class Settings(BaseSettings):
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440
+
+    # Storage backend: "mongo", or embedded "sqlite" / "memory" for tests and
+    # small single-node installs (no archive tier, change streams or shared rate limits)
+    database_backend: Literal["mongo", "sqlite", "memory"] = "mongo"
+    sqlite_path: str = "funds.db"
+
+    # MongoDB client limits, so a stalled server can't hold requests forever
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_connect_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: int = 30000
+    mongo_wait_queue_timeout_ms: int = 5000  # Waiting for a free pool connection
+
+    # Per-request time budget (seconds) shared by all database calls a request
+    # makes; requests that exceed it get 503. Keyed by "METHOD /path"; 0 disables.
+    request_timeout_seconds: float = 10.0
+    request_timeouts: dict[str, float] = {
+        "POST /auth/login": 5.0,
+        "GET /user/account": 2.0,
+        "GET /user/dashboard": 3.0,
+        "GET /user/transactions": 5.0,
+        "GET /admin/users": 5.0,
+        "GET /admin/deposits": 5.0,
+        "GET /admin/deposits/forecast": 30.0,
+    }
+
+    # Clock for business time: "system", or "simulated" for time-travel load tests
+    # (single worker; starts at clock_start, runs at clock_rate and can be
+    # advanced with POST /admin/clock/advance)
+    clock: Literal["system", "simulated"] = "system"
+    clock_start: Optional[datetime] = None
+    clock_rate: float = 1.0
+
+    # Ledger: write a balance snapshot every N entries per user (0 disables)
+    ledger_snapshot_interval: int = 50
+
+    # Transactions kept on the per-user account document served by /user/account
+    account_recent_transactions: int = 10
+
+    # Transactions older than this move to the archive tier
+    transaction_archive_after_days: int = 365
+    transaction_archive_interval_minutes: int = 0  # 0 disables the background archiver
     
+    # Deposit proof uploads (content-addressed on local disk)
+    proof_storage_dir: str = "uploads/proofs"
+    proof_max_bytes: int = 20 * 1024 * 1024
+    proof_allowed_types: list[str] = ["application/pdf", "image/jpeg", "image/png", "image/webp"]
+
+    # Live updates: "local" publishes from the request handlers (single worker);
+    # "change_stream" relays MongoDB change streams (multi-worker, needs a replica set)
+    event_source: Literal["local", "change_stream"] = "local"
+    sse_keepalive_seconds: float = 15.0
+    sse_retry_ms: int = 5000
+    sse_token_seconds: int = 60  # Lifetime of the ?token= for opening a browser EventSource
+
+    # Cache invalidation across workers: "local" applies it in-process only
+    # (single worker); "change_stream" broadcasts through the `invalidations`
+    # collection (multi-worker, needs a replica set). See gunicorn.conf.py.
+    invalidation_source: Literal["local", "change_stream"] = "local"
+    principal_cache_seconds: float = 30.0  # Users resolved from tokens; 0 disables
+    principal_cache_size: int = 10_000
+
+    # Rate limiting: token buckets per user (or client address) and route.
+    # "memory" limits each worker separately; "mongo" shares buckets across workers.
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "mongo"] = "memory"
+    rate_limit_rate: float = 10.0  # Tokens per second for routes without their own limit
+    rate_limit_burst: int = 40
+    # With "mongo": how long a bucket update may take before this worker
+    # falls back to limiting the request in memory
+    rate_limit_timeout_seconds: float = 0.1
+    rate_limit_routes: dict[str, tuple[float, int]] = {
+        "POST /auth/login": (0.2, 5),
+        "POST /user/deposit": (0.1, 3),
+        "POST /user/deposit/proof": (0.1, 3),
+        "POST /user/withdraw": (0.1, 3),
+    }
+
+    # Idempotency-Key support for POST /user/deposit and /user/withdraw
+    idempotency_ttl_hours: int = 24
+    idempotency_cache_size: int = 10_000
+    idempotency_lock_seconds: int = 60  # In-progress keys older than this may be retried
+
+    # Audit log of admin actions and financial reads, buffered and written in
+    # batches off the request path. When the queue is full, reads are dropped and
+    # admin actions wait up to audit_block_seconds (both counted in /metrics).
+    audit_enabled: bool = True
+    audit_queue_size: int = 10_000
+    audit_batch_size: int = 500
+    audit_flush_seconds: float = 1.0
+    audit_block_seconds: float = 0.5
+
     # Default admin credentials
     default_admin_username: str = "admin"
     default_admin_password: str = "admin123"
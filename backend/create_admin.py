@@ -44,6 +44,8 @@ async def recreate_admin():
         admin_doc = {
             "username": admin_username,
             "email": admin_email,
+            "username_lower": admin_username.lower(),
+            "email_lower": admin_email.lower(),
             "password_hash": password_hash,
             "role": "admin",
             "created_at": datetime.utcnow(),
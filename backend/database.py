@@ -10,7 +10,11 @@ async def connect_to_mongo():
     global client, database
     client = AsyncIOMotorClient(
         settings.mongodb_uri,
-        tlsCAFile=certifi.where()
+        tlsCAFile=certifi.where(),
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        connectTimeoutMS=settings.mongo_connect_timeout_ms,
+        socketTimeoutMS=settings.mongo_socket_timeout_ms,
+        waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms
     )
     database = client[settings.database_name]
     print(f"Connected to MongoDB at {settings.mongodb_uri[:50]}...")
@@ -23,6 +27,49 @@ async def close_mongo_connection():
         print("Closed MongoDB connection")
 
 
+async def create_indexes():
+    """
+    Create the indexes the application relies on (no-op if they exist).
+    """
+    db = get_database()
+    for tier in ("transactions", "transactions_archive"):
+        await db[tier].create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+    await db.transactions.create_index(
+        [("user_id", 1), ("seq", 1)],
+        unique=True,
+        partialFilterExpression={"seq": {"$exists": True}}
+    )
+    await db.transactions_archive.create_index([("user_id", 1), ("seq", 1)])
+    await db.transactions.create_index("timestamp")  # Archiver scans by age
+    await db.balance_snapshots.create_index([("user_id", 1), ("seq", -1)], unique=True)
+
+    # Per-user deposit lookups and admin deposit filters/sorts
+    await db.deposits.create_index([("user_id", 1), ("status", 1)])
+    await db.deposits.create_index([("user_id", 1), ("submitted_at", -1), ("_id", -1)])
+    for field in ("submitted_at", "approved_at", "amount"):
+        await db.deposits.create_index([(field, -1), ("_id", -1)])
+        await db.deposits.create_index([("status", 1), (field, -1), ("_id", -1)])
+
+    # Admin user search and listing
+    await db.users.update_many(
+        {"username_lower": {"$exists": False}},
+        [{"$set": {"username_lower": {"$toLower": "$username"}, "email_lower": {"$toLower": "$email"}}}]
+    )
+    await db.users.create_index("username")
+    await db.users.create_index("username_lower")
+    await db.users.create_index("email_lower")
+    await db.users.create_index([("role", 1), ("created_at", -1), ("_id", -1)])
+    await db.idempotency_keys.create_index(
+        "created_at",
+        expireAfterSeconds=settings.idempotency_ttl_hours * 3600
+    )
+    await db.invalidations.create_index("created_at", expireAfterSeconds=3600)
+    await db.audit_log.create_index([("actor_id", 1), ("at", -1)])
+    await db.audit_log.create_index([("action", 1), ("at", -1)])
+    if settings.rate_limit_backend == "mongo":
+        await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+
+
 def get_database():
     return database
 
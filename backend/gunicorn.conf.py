@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for multi-worker deployments: gunicorn main:app
+
+Workers share nothing in-process, so running more than one needs every
+cross-worker setting pointed at MongoDB (a single-node replica set is
+enough for change streams):
+
+    DATABASE_BACKEND=mongo
+    INVALIDATION_SOURCE=change_stream   # ETag versions and principal cache
+    EVENT_SOURCE=change_stream          # SSE and admin WebSocket feeds
+    RATE_LIMIT_BACKEND=mongo            # Shared token buckets
+
+Otherwise a single worker is started.
+"""
+import multiprocessing
+import os
+from config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+graceful_timeout = 30
+keepalive = 5
+
+_shared = (
+    settings.database_backend == "mongo"
+    and settings.invalidation_source == "change_stream"
+    and settings.event_source == "change_stream"
+    and settings.clock == "system"  # The simulated clock is per process
+)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count())) if _shared else 1
+
+
+def when_ready(server):
+    if not _shared:
+        server.log.warning("Running a single worker: set DATABASE_BACKEND=mongo and "
+                           "INVALIDATION_SOURCE/EVENT_SOURCE=change_stream for multi-worker mode")
+    elif settings.rate_limit_enabled and settings.rate_limit_backend != "mongo":
+        server.log.warning("Rate limits are per worker; set RATE_LIMIT_BACKEND=mongo to share them")
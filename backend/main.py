@@ -1,21 +1,44 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from database import connect_to_mongo, close_mongo_connection, get_database
+from database import get_database
+from repositories import open_repositories, close_repositories, get_repositories
 from routes import auth, admin, user
 from config import settings
 from utils.auth import get_password_hash
-from datetime import datetime
+from utils.archive import run_archiver
+from utils.events import run_change_stream_relay
+from utils.invalidation import run_invalidation_relay
+from utils.audit import audit_log
+from utils.rate_limit import RateLimitMiddleware, MongoRateLimitStore
+from utils.deadline import DeadlineMiddleware
+from utils.storage import UploadLimitMiddleware
+from utils.metrics import render as render_metrics
+from utils.clock import utcnow
+import asyncio
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await connect_to_mongo()
+    await open_repositories()
     await create_default_admin()
+    audit_log.start()
+    tasks = []
+    if settings.database_backend == "mongo":
+        if settings.transaction_archive_interval_minutes > 0:
+            tasks.append(asyncio.create_task(run_archiver(get_database())))
+        if settings.event_source == "change_stream":
+            tasks.append(asyncio.create_task(run_change_stream_relay(get_database())))
+        if settings.invalidation_source == "change_stream":
+            tasks.append(asyncio.create_task(run_invalidation_relay(get_database())))
     yield
     # Shutdown
-    await close_mongo_connection()
+    for task in tasks:
+        task.cancel()
+    await audit_log.close()  # Write out buffered events before the database closes
+    await close_repositories()
 
 
 app = FastAPI(
@@ -25,13 +48,26 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware
+# Innermost, so the budget covers only the request's own database calls
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(UploadLimitMiddleware)
+
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=MongoRateLimitStore()
+        if settings.rate_limit_backend == "mongo" and settings.database_backend == "mongo"
+        else None
+    )
+
+# CORS middleware (added last so it also wraps rate-limited responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],  # React dev servers
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Readable by browser clients
 )
 
 # Include routers
@@ -54,26 +90,33 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
+
+
 async def create_default_admin():
     """
     Create default admin account if it doesn't exist.
     """
-    db = get_database()
+    users = get_repositories().users
     
     # Check if admin already exists
-    admin_exists = await db.users.find_one({"username": settings.default_admin_username})
+    admin_exists = await users.get_by_username(settings.default_admin_username)
     
     if not admin_exists:
         admin_doc = {
             "username": settings.default_admin_username,
             "email": settings.default_admin_email,
+            "username_lower": settings.default_admin_username.lower(),
+            "email_lower": settings.default_admin_email.lower(),
             "password_hash": get_password_hash(settings.default_admin_password),
             "role": "admin",
-            "created_at": datetime.utcnow(),
+            "created_at": utcnow(),
             "is_active": True
         }
         
-        await db.users.insert_one(admin_doc)
+        await users.create(admin_doc)
         print(f"✅ Default admin account created:")
         print(f"   Username: {settings.default_admin_username}")
         print(f"   Password: {settings.default_admin_password}")
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Literal
 from datetime import datetime
+from utils.clock import utcnow
 
 
 class DepositCreate(BaseModel):
@@ -8,13 +9,20 @@ class DepositCreate(BaseModel):
     proof_url: str  # URL or path to uploaded proof document
 
 
+class ProofUploadResponse(BaseModel):
+    proof_url: str  # Pass as DepositCreate.proof_url
+    sha256: str
+    size: int
+    content_type: str
+
+
 class DepositInDB(BaseModel):
     id: Optional[str] = Field(alias="_id", default=None)
     user_id: str
     amount: float
     proof_url: str
     status: Literal["pending", "approved", "rejected", "withdrawn"] = "pending"
-    submitted_at: datetime = Field(default_factory=datetime.utcnow)
+    submitted_at: datetime = Field(default_factory=utcnow)
     approved_at: Optional[datetime] = None
     approved_by: Optional[str] = None
     maturity_date: Optional[datetime] = None
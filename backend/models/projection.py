@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Literal
+from datetime import datetime
+
+
+class ProjectionPoint(BaseModel):
+    day: int
+    date: datetime
+    accrued_interest: float
+    balance: float  # Principal plus interest still held
+    cumulative_payout: float
+
+
+class PayoutEvent(BaseModel):
+    day: int
+    date: datetime
+    amount: float
+
+
+class DepositProjection(BaseModel):
+    deposit_id: str
+    mode: Literal["rollover", "full"]
+    principal: float
+    interest_rate: float
+    schedule: list[ProjectionPoint]
+    payouts: list[PayoutEvent]
+
+
+class LiabilityForecast(BaseModel):
+    mode: Literal["rollover", "full"]
+    deposit_count: int
+    days: list[int]
+    dates: list[datetime]
+    total_balance: list[float]  # Held across the book on each day
+    cumulative_payout: list[float]
+    period_payout: list[float]  # Paid out since the previous grid day
@@ -1,16 +1,18 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Literal
 from datetime import datetime
+from utils.clock import utcnow
 
 
 class TransactionInDB(BaseModel):
     id: Optional[str] = Field(alias="_id", default=None)
     user_id: str
+    seq: Optional[int] = None  # Per-user ledger sequence number
     deposit_id: Optional[str] = None
     type: Literal["deposit", "withdrawal", "interest_accrual"]
     amount: float
     balance_after: float
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utcnow)
     description: str
 
     model_config = ConfigDict(
@@ -22,6 +24,7 @@ class TransactionInDB(BaseModel):
 class TransactionResponse(BaseModel):
     id: str
     user_id: str
+    seq: Optional[int] = None
     deposit_id: Optional[str] = None
     type: str
     amount: float
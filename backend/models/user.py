@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional, Literal
 from datetime import datetime
+from utils.clock import utcnow
 
 
 class UserBase(BaseModel):
@@ -16,7 +17,7 @@ class UserCreate(UserBase):
 class UserInDB(UserBase):
     id: Optional[str] = Field(alias="_id", default=None)
     password_hash: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     is_active: bool = True
 
     model_config = ConfigDict(
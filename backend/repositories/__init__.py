@@ -0,0 +1,45 @@
+from typing import Optional
+from config import settings
+from database import connect_to_mongo, close_mongo_connection, create_indexes, get_database
+from repositories.base import (
+    ACTIVE_STATUSES,
+    AuditLog,
+    DepositRepository,
+    IdempotencyStore,
+    Repositories,
+    TransactionRepository,
+    UserRepository,
+)
+
+repositories: Optional[Repositories] = None
+
+
+async def open_repositories():
+    """
+    Open the data access layer for the configured `database_backend`.
+    """
+    global repositories
+    if settings.database_backend == "mongo":
+        from repositories.mongo import MongoRepositories
+        await connect_to_mongo()
+        await create_indexes()
+        repositories = MongoRepositories(get_database())
+    elif settings.database_backend == "sqlite":
+        from repositories.sqlite import SqliteRepositories
+        repositories = SqliteRepositories(settings.sqlite_path)
+        print(f"Opened SQLite database at {settings.sqlite_path}")
+    else:
+        from repositories.memory import MemoryRepositories
+        repositories = MemoryRepositories()
+        print("Using in-memory storage; data is lost on restart")
+
+
+async def close_repositories():
+    if repositories:
+        await repositories.close()
+    if settings.database_backend == "mongo":
+        await close_mongo_connection()
+
+
+def get_repositories() -> Repositories:
+    return repositories
@@ -0,0 +1,204 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Literal, Optional
+from config import settings
+
+# Repositories return plain documents shaped like the MongoDB ones: `_id` is
+# an ObjectId, references (user_id, deposit_id) are id strings and times are
+# naive UTC datetimes, whatever the backend stores internally.
+
+ACTIVE_STATUSES = ("pending", "approved")
+
+# Range filters accepted by DepositRepository.search, as (low, high) bounds
+DepositRanges = dict[Literal["amount", "submitted_at", "approved_at"], tuple[Optional[object], Optional[object]]]
+
+
+class UserRepository(ABC):
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[dict]:
+        """Get a user by id (None if missing or not a valid id)."""
+
+    @abstractmethod
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def create(self, user: dict) -> dict:
+        """Insert a user, returning it with its new `_id`."""
+
+    @abstractmethod
+    async def search(
+        self,
+        q: Optional[str] = None,
+        match: Literal["prefix", "substring"] = "prefix",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        """
+        List regular users by created_at, optionally matching `q` case-insensitively
+        against username or email. A "substring" match scans users in order
+        and should be bounded by `limit`.
+
+        Args:
+            after: (created_at, _id) of the last user on the previous page
+        """
+
+
+class DepositRepository(ABC):
+
+    @abstractmethod
+    async def get(self, deposit_id: str) -> Optional[dict]:
+        """Get a deposit by id (None if missing or not a valid id)."""
+
+    @abstractmethod
+    async def find_active(self, user_id: str, statuses: tuple[str, ...] = ACTIVE_STATUSES) -> Optional[dict]:
+        """Get the user's deposit in one of `statuses` (at most one is open at a time)."""
+
+    @abstractmethod
+    async def create(self, deposit: dict) -> dict:
+        """Insert a deposit, returning it with its new `_id`."""
+
+    @abstractmethod
+    async def update(self, deposit: dict, changes: dict) -> Optional[dict]:
+        """
+        Apply `changes` to a deposit if its `status` and `approved_at` are
+        still those of `deposit`, as the caller read it.
+
+        Returns:
+            The updated deposit, or None if another request changed it first
+        """
+
+    @abstractmethod
+    async def search(
+        self,
+        statuses: Optional[list[str]] = None,
+        user_id: Optional[str] = None,
+        ranges: Optional[DepositRanges] = None,
+        sort: Literal["submitted_at", "approved_at", "amount"] = "submitted_at",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        """
+        List deposits matching the filters. Sorting by approved_at only
+        returns deposits that have been approved.
+
+        Args:
+            ranges: Inclusive (low, high) bounds per field; either may be None
+            after: (sort value, _id) of the last deposit on the previous page
+        """
+
+    @abstractmethod
+    async def save_proof(self, sha256: str, proof: dict):
+        """Record an uploaded proof's metadata (kept as is if already known)."""
+
+    @abstractmethod
+    async def get_proof(self, sha256: str) -> Optional[dict]:
+        ...
+
+
+class TransactionRepository(ABC):
+
+    @abstractmethod
+    async def append(
+        self,
+        user_id: str,
+        entry_type: str,
+        amount: float,
+        description: str,
+        deposit_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> dict:
+        """
+        Append an entry to a user's ledger, allocating its sequence number
+        and running balance atomically.
+        """
+
+    @abstractmethod
+    async def history(self, user_id: str, limit: int = 0, after: Optional[list] = None) -> list[dict]:
+        """
+        Get a user's transactions, newest first.
+
+        Args:
+            after: (timestamp, _id) of the last entry on the previous page
+        """
+
+    @abstractmethod
+    async def balance_at(self, user_id: str, as_of: Optional[datetime] = None) -> float:
+        ...
+
+    @abstractmethod
+    async def entries(self, user_id: str, start: datetime, end: datetime) -> list[dict]:
+        """Get ledger entries recorded in (start, end], ordered by sequence number."""
+
+
+class IdempotencyStore(ABC):
+    """Reservations and stored responses for Idempotency-Key handling."""
+
+    @abstractmethod
+    async def reserve(self, record_id: str, fingerprint: str, now: datetime) -> Optional[dict]:
+        """
+        Atomically reserve a key unless it exists.
+
+        Returns:
+            The existing record, or None if this call reserved the key
+        """
+
+    @abstractmethod
+    async def take_over(self, record_id: str, created_at: datetime, fingerprint: str, now: datetime) -> bool:
+        """Claim an in-progress reservation made at `created_at`; False if it changed."""
+
+    @abstractmethod
+    async def complete(self, record_id: str, record: dict):
+        ...
+
+    @abstractmethod
+    async def release(self, record_id: str):
+        """Drop a reservation so the request can be retried."""
+
+
+class AuditLog(ABC):
+    """Append-only audit events, written in batches by utils.audit."""
+
+    @abstractmethod
+    async def insert_many(self, events: list[dict]) -> list[dict]:
+        """
+        Store a batch of events.
+
+        Retrying a batch that was partly stored must not store any event
+        twice. Raises when nothing is known to be stored.
+
+        Returns:
+            The events that could not be stored (empty when all were)
+        """
+
+
+class Repositories:
+    """
+    The data access layer for one backend.
+    """
+
+    users: UserRepository
+    deposits: DepositRepository
+    transactions: TransactionRepository
+    idempotency: IdempotencyStore
+    audit: AuditLog
+
+    async def account(self, user_id: str) -> dict:
+        """
+        Get what the dashboard shows for a user besides the profile:
+        `active_deposit` and the newest `recent_transactions`.
+        """
+        return {
+            "active_deposit": await self.deposits.find_active(user_id),
+            "recent_transactions": await self.transactions.history(user_id, settings.account_recent_transactions),
+        }
+
+    async def close(self):
+        pass
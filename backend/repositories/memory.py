@@ -0,0 +1,255 @@
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from bson import ObjectId
+from config import settings
+from repositories.base import (
+    ACTIVE_STATUSES,
+    AuditLog,
+    DepositRanges,
+    DepositRepository,
+    IdempotencyStore,
+    Repositories,
+    TransactionRepository,
+    UserRepository,
+)
+from utils.ledger import signed_amount
+from utils.clock import naive_utc, utcnow
+
+# Process-local storage for tests and single-process development. Operations
+# never await between reading and writing, so each one is atomic on the event
+# loop without locks. Documents are copied in and out so callers can't
+# mutate stored state, and times are stored as naive UTC at MongoDB's
+# millisecond precision, which cursors rely on. Times passed in queries may
+# be timezone-aware and are converted the same way before comparing.
+
+
+def _time(value: datetime) -> datetime:
+    value = naive_utc(value)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def _stored(doc: dict) -> dict:
+    return {key: _time(value) if isinstance(value, datetime) else value for key, value in doc.items()}
+
+
+def _bound(value):
+    return naive_utc(value) if isinstance(value, datetime) else value
+
+
+def _after(key: tuple, after: list, descending: bool) -> bool:
+    return key < tuple(after) if descending else key > tuple(after)
+
+
+class MemoryUserRepository(UserRepository):
+
+    def __init__(self):
+        self._users: dict[ObjectId, dict] = {}
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        user = self._users.get(ObjectId(user_id)) if ObjectId.is_valid(user_id) else None
+        return dict(user) if user else None
+
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        return next((dict(u) for u in self._users.values() if u["username"] == username), None)
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        return next((dict(u) for u in self._users.values() if u["email"] == email), None)
+
+    async def create(self, user: dict) -> dict:
+        user = _stored({**user, "_id": ObjectId()})
+        self._users[user["_id"]] = user
+        return dict(user)
+
+    async def search(
+        self,
+        q: Optional[str] = None,
+        match: Literal["prefix", "substring"] = "prefix",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        descending = order == "desc"
+        needle = q.lower() if q else None
+        users = []
+        for user in self._users.values():
+            if user["role"] != "user":
+                continue
+            if needle:
+                fields = (user["username"].lower(), user["email"].lower())
+                if match == "prefix" and not any(f.startswith(needle) for f in fields):
+                    continue
+                if match == "substring" and not any(needle in f for f in fields):
+                    continue
+            if after and not _after((user["created_at"], user["_id"]), after, descending):
+                continue
+            users.append(user)
+        users.sort(key=lambda u: (u["created_at"], u["_id"]), reverse=descending)
+        return [dict(u) for u in (users[:limit] if limit else users)]
+
+
+class MemoryDepositRepository(DepositRepository):
+
+    def __init__(self):
+        self._deposits: dict[ObjectId, dict] = {}
+        self._proofs: dict[str, dict] = {}
+
+    async def get(self, deposit_id: str) -> Optional[dict]:
+        deposit = self._deposits.get(ObjectId(deposit_id)) if ObjectId.is_valid(deposit_id) else None
+        return dict(deposit) if deposit else None
+
+    async def find_active(self, user_id: str, statuses: tuple[str, ...] = ACTIVE_STATUSES) -> Optional[dict]:
+        return next(
+            (dict(d) for d in self._deposits.values() if d["user_id"] == user_id and d["status"] in statuses),
+            None
+        )
+
+    async def create(self, deposit: dict) -> dict:
+        deposit = _stored({**deposit, "_id": ObjectId()})
+        self._deposits[deposit["_id"]] = deposit
+        return dict(deposit)
+
+    async def update(self, deposit: dict, changes: dict) -> Optional[dict]:
+        stored = self._deposits[deposit["_id"]]
+        if (stored["status"], stored["approved_at"]) != (deposit["status"], deposit["approved_at"]):
+            return None
+        stored.update(_stored(changes))
+        return dict(stored)
+
+    async def search(
+        self,
+        statuses: Optional[list[str]] = None,
+        user_id: Optional[str] = None,
+        ranges: Optional[DepositRanges] = None,
+        sort: Literal["submitted_at", "approved_at", "amount"] = "submitted_at",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        descending = order == "desc"
+        deposits = []
+        for deposit in self._deposits.values():
+            if statuses and deposit["status"] not in statuses:
+                continue
+            if user_id and deposit["user_id"] != user_id:
+                continue
+            if not all(
+                deposit.get(field) is not None
+                and (low is None or deposit[field] >= _bound(low))
+                and (high is None or deposit[field] <= _bound(high))
+                for field, (low, high) in (ranges or {}).items()
+                if low is not None or high is not None
+            ):
+                continue
+            if deposit.get(sort) is None:
+                continue
+            if after and not _after((deposit[sort], deposit["_id"]), after, descending):
+                continue
+            deposits.append(deposit)
+        deposits.sort(key=lambda d: (d[sort], d["_id"]), reverse=descending)
+        return [dict(d) for d in (deposits[:limit] if limit else deposits)]
+
+    async def save_proof(self, sha256: str, proof: dict):
+        self._proofs.setdefault(sha256, {"_id": sha256, **proof})
+
+    async def get_proof(self, sha256: str) -> Optional[dict]:
+        return self._proofs.get(sha256)
+
+
+class MemoryTransactionRepository(TransactionRepository):
+
+    def __init__(self):
+        self._ledgers: dict[str, list[dict]] = {}  # user_id -> entries in seq order
+
+    async def append(
+        self,
+        user_id: str,
+        entry_type: str,
+        amount: float,
+        description: str,
+        deposit_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> dict:
+        ledger = self._ledgers.setdefault(user_id, [])
+        balance = ledger[-1]["balance_after"] if ledger else 0.0
+        entry = _stored({
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "seq": len(ledger) + 1,
+            "deposit_id": deposit_id,
+            "type": entry_type,
+            "amount": amount,
+            "balance_after": round(balance + signed_amount(entry_type, amount), 2),
+            "timestamp": timestamp or utcnow(),
+            "description": description,
+        })
+        ledger.append(entry)
+        return dict(entry)
+
+    async def history(self, user_id: str, limit: int = 0, after: Optional[list] = None) -> list[dict]:
+        entries = sorted(
+            self._ledgers.get(user_id, []),
+            key=lambda e: (e["timestamp"], e["_id"]),
+            reverse=True
+        )
+        if after:
+            entries = [e for e in entries if _after((e["timestamp"], e["_id"]), after, True)]
+        return [dict(e) for e in (entries[:limit] if limit else entries)]
+
+    async def balance_at(self, user_id: str, as_of: Optional[datetime] = None) -> float:
+        as_of = naive_utc(as_of) or utcnow()
+        balance = sum(
+            signed_amount(e["type"], e["amount"])
+            for e in self._ledgers.get(user_id, [])
+            if e["timestamp"] <= as_of
+        )
+        return round(balance, 2)
+
+    async def entries(self, user_id: str, start: datetime, end: datetime) -> list[dict]:
+        start, end = naive_utc(start), naive_utc(end)
+        return [dict(e) for e in self._ledgers.get(user_id, []) if start < e["timestamp"] <= end]
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+
+    def __init__(self):
+        self._records: dict[str, dict] = {}
+
+    async def reserve(self, record_id: str, fingerprint: str, now: datetime) -> Optional[dict]:
+        existing = self._records.get(record_id)
+        if existing and now - existing["created_at"] < timedelta(hours=settings.idempotency_ttl_hours):
+            return dict(existing)
+        self._records[record_id] = {"fingerprint": fingerprint, "state": "in_progress", "created_at": now}
+        return None
+
+    async def take_over(self, record_id: str, created_at: datetime, fingerprint: str, now: datetime) -> bool:
+        record = self._records.get(record_id)
+        if not record or record["state"] != "in_progress" or record["created_at"] != created_at:
+            return False
+        record.update(fingerprint=fingerprint, created_at=now)
+        return True
+
+    async def complete(self, record_id: str, record: dict):
+        self._records[record_id].update(record)
+
+    async def release(self, record_id: str):
+        self._records.pop(record_id, None)
+
+
+class MemoryAuditLog(AuditLog):
+
+    def __init__(self):
+        self.events: list[dict] = []
+
+    async def insert_many(self, events: list[dict]) -> list[dict]:
+        self.events.extend(dict(event) for event in events)
+        return []
+
+
+class MemoryRepositories(Repositories):
+
+    def __init__(self):
+        self.users = MemoryUserRepository()
+        self.deposits = MemoryDepositRepository()
+        self.transactions = MemoryTransactionRepository()
+        self.idempotency = MemoryIdempotencyStore()
+        self.audit = MemoryAuditLog()
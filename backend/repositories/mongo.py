@@ -0,0 +1,244 @@
+import re
+from datetime import datetime
+from typing import Literal, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from repositories.base import (
+    ACTIVE_STATUSES,
+    AuditLog,
+    DepositRanges,
+    DepositRepository,
+    IdempotencyStore,
+    Repositories,
+    TransactionRepository,
+    UserRepository,
+)
+from utils.accounts import get_account, record_deposit
+from utils.archive import find_across_tiers
+from utils.ledger import append_entry, balance_at, ledger_entries
+from utils.pagination import keyset_filter
+
+# Fields needed for UserResponse; never load password hashes for listings
+USER_PROJECTION = {"username": 1, "email": 1, "role": 1, "created_at": 1, "is_active": 1}
+
+# Newest first; _id breaks ties between entries written in the same request
+HISTORY_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def _object_id(value: str) -> Optional[ObjectId]:
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+
+class MongoUserRepository(UserRepository):
+
+    def __init__(self, db):
+        self.db = db
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        oid = _object_id(user_id)
+        return await self.db.users.find_one({"_id": oid}) if oid else None
+
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        return await self.db.users.find_one({"username": username})
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        return await self.db.users.find_one({"email": email})
+
+    async def create(self, user: dict) -> dict:
+        result = await self.db.users.insert_one(user)
+        return {**user, "_id": result.inserted_id}
+
+    async def search(
+        self,
+        q: Optional[str] = None,
+        match: Literal["prefix", "substring"] = "prefix",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        direction = -1 if order == "desc" else 1
+        sort = [("created_at", direction), ("_id", direction)]
+        query = {"role": "user"}
+        if q:
+            # Case-insensitive via the lowercased copies. Anchored prefixes use
+            # the index range; a substring regex is tested against each user
+            # the sort index yields, so only `limit` bounds it
+            pattern = re.escape(q.lower())
+            if match == "prefix":
+                pattern = "^" + pattern
+            query["$or"] = [
+                {"username_lower": {"$regex": pattern}},
+                {"email_lower": {"$regex": pattern}}
+            ]
+        if after:
+            query = {"$and": [query, keyset_filter(sort, after)]}
+        return await self.db.users.find(query, USER_PROJECTION).sort(sort).limit(limit).to_list(length=None)
+
+
+class MongoDepositRepository(DepositRepository):
+    """
+    Deposits in MongoDB. Every write also updates the user's denormalized
+    account document.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def get(self, deposit_id: str) -> Optional[dict]:
+        oid = _object_id(deposit_id)
+        return await self.db.deposits.find_one({"_id": oid}) if oid else None
+
+    async def find_active(self, user_id: str, statuses: tuple[str, ...] = ACTIVE_STATUSES) -> Optional[dict]:
+        return await self.db.deposits.find_one({"user_id": user_id, "status": {"$in": list(statuses)}})
+
+    async def create(self, deposit: dict) -> dict:
+        result = await self.db.deposits.insert_one(deposit)
+        deposit = {**deposit, "_id": result.inserted_id}
+        await record_deposit(self.db, deposit)
+        return deposit
+
+    async def update(self, deposit: dict, changes: dict) -> Optional[dict]:
+        deposit = await self.db.deposits.find_one_and_update(
+            {"_id": deposit["_id"], "status": deposit["status"], "approved_at": deposit.get("approved_at")},
+            {"$set": changes},
+            return_document=ReturnDocument.AFTER
+        )
+        if deposit:
+            await record_deposit(self.db, deposit)
+        return deposit
+
+    async def search(
+        self,
+        statuses: Optional[list[str]] = None,
+        user_id: Optional[str] = None,
+        ranges: Optional[DepositRanges] = None,
+        sort: Literal["submitted_at", "approved_at", "amount"] = "submitted_at",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        query = {}
+        if statuses:
+            query["status"] = {"$in": statuses}
+        if user_id:
+            query["user_id"] = user_id
+        for field, (low, high) in (ranges or {}).items():
+            if low is not None or high is not None:
+                query[field] = {}
+                if low is not None:
+                    query[field]["$gte"] = low
+                if high is not None:
+                    query[field]["$lte"] = high
+        if sort == "approved_at":
+            query.setdefault("approved_at", {})["$ne"] = None
+
+        direction = -1 if order == "desc" else 1
+        sort_spec = [(sort, direction), ("_id", direction)]
+        if after:
+            query = {"$and": [query, keyset_filter(sort_spec, after)]}
+        return await self.db.deposits.find(query).sort(sort_spec).limit(limit).to_list(length=None)
+
+    async def save_proof(self, sha256: str, proof: dict):
+        await self.db.proofs.update_one({"_id": sha256}, {"$setOnInsert": proof}, upsert=True)
+
+    async def get_proof(self, sha256: str) -> Optional[dict]:
+        return await self.db.proofs.find_one({"_id": sha256})
+
+
+class MongoTransactionRepository(TransactionRepository):
+    """
+    The ledger in MongoDB: hot and archive tiers, ledger heads and balance
+    snapshots (see utils.ledger and utils.archive).
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def append(
+        self,
+        user_id: str,
+        entry_type: str,
+        amount: float,
+        description: str,
+        deposit_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> dict:
+        return await append_entry(self.db, user_id, entry_type, amount, description, deposit_id, timestamp)
+
+    async def history(self, user_id: str, limit: int = 0, after: Optional[list] = None) -> list[dict]:
+        query = {"user_id": user_id}
+        if after:
+            query.update(keyset_filter(HISTORY_SORT, after))
+        return await find_across_tiers(self.db, query, HISTORY_SORT, limit)
+
+    async def balance_at(self, user_id: str, as_of: Optional[datetime] = None) -> float:
+        return await balance_at(self.db, user_id, as_of)
+
+    async def entries(self, user_id: str, start: datetime, end: datetime) -> list[dict]:
+        return await ledger_entries(self.db, user_id, start, end)
+
+
+class MongoIdempotencyStore(IdempotencyStore):
+    """
+    Idempotency records shared by all workers; expired by a TTL index.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def reserve(self, record_id: str, fingerprint: str, now: datetime) -> Optional[dict]:
+        return await self.db.idempotency_keys.find_one_and_update(
+            {"_id": record_id},
+            {"$setOnInsert": {"fingerprint": fingerprint, "state": "in_progress", "created_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    async def take_over(self, record_id: str, created_at: datetime, fingerprint: str, now: datetime) -> bool:
+        result = await self.db.idempotency_keys.update_one(
+            {"_id": record_id, "state": "in_progress", "created_at": created_at},
+            {"$set": {"fingerprint": fingerprint, "created_at": now}},
+        )
+        return result.modified_count == 1
+
+    async def complete(self, record_id: str, record: dict):
+        await self.db.idempotency_keys.update_one({"_id": record_id}, {"$set": record})
+
+    async def release(self, record_id: str):
+        await self.db.idempotency_keys.delete_one({"_id": record_id})
+
+
+class MongoAuditLog(AuditLog):
+
+    def __init__(self, db):
+        self.db = db
+
+    async def insert_many(self, events: list[dict]) -> list[dict]:
+        # Unordered, so one bad event doesn't stop the rest of the batch.
+        # insert_many sets `_id` on the events in place, so a retry re-sends
+        # the events stored by an earlier attempt with the same `_id`; a
+        # duplicate key means the event is already stored
+        try:
+            await self.db.audit_log.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            return [
+                events[error["index"]] for error in e.details["writeErrors"]
+                if error["code"] != 11000
+            ]
+        return []
+
+
+class MongoRepositories(Repositories):
+
+    def __init__(self, db):
+        self.db = db
+        self.users = MongoUserRepository(db)
+        self.deposits = MongoDepositRepository(db)
+        self.transactions = MongoTransactionRepository(db)
+        self.idempotency = MongoIdempotencyStore(db)
+        self.audit = MongoAuditLog(db)
+
+    async def account(self, user_id: str) -> dict:
+        # One read of the denormalized account document
+        return await get_account(self.db, user_id)
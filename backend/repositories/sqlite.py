@@ -0,0 +1,493 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from bson import ObjectId
+from config import settings
+from repositories.base import (
+    ACTIVE_STATUSES,
+    AuditLog,
+    DepositRanges,
+    DepositRepository,
+    IdempotencyStore,
+    Repositories,
+    TransactionRepository,
+    UserRepository,
+)
+from utils.ledger import CREDIT_TYPES, signed_amount
+from utils.clock import naive_utc, utcnow
+
+# Embedded single-node storage. Ids are ObjectId hex strings and times are
+# integer milliseconds since the epoch (MongoDB's precision, which cursors
+# rely on), so both sort correctly in SQL. Naive times are taken as UTC and
+# aware ones converted, so either may be passed in.
+# Statements are issued with fixed SQL text and bound parameters, which the
+# sqlite3 module compiles once per connection and reuses from its cache.
+# Queries run synchronously on the event loop: with no network hop they take
+# microseconds, less than handing them to a thread would.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    username_lower TEXT NOT NULL,
+    email_lower TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    is_active INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_role_created ON users (role, created_at, id);
+
+CREATE TABLE IF NOT EXISTS deposits (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    proof_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at INTEGER NOT NULL,
+    approved_at INTEGER,
+    approved_by TEXT,
+    maturity_date INTEGER,
+    interest_rate REAL NOT NULL,
+    current_balance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deposits_user_status ON deposits (user_id, status);
+CREATE INDEX IF NOT EXISTS deposits_user_submitted ON deposits (user_id, submitted_at, id);
+CREATE INDEX IF NOT EXISTS deposits_submitted ON deposits (submitted_at, id);
+CREATE INDEX IF NOT EXISTS deposits_approved ON deposits (approved_at, id);
+CREATE INDEX IF NOT EXISTS deposits_amount ON deposits (amount, id);
+CREATE INDEX IF NOT EXISTS deposits_status_submitted ON deposits (status, submitted_at, id);
+CREATE INDEX IF NOT EXISTS deposits_status_approved ON deposits (status, approved_at, id);
+CREATE INDEX IF NOT EXISTS deposits_status_amount ON deposits (status, amount, id);
+
+CREATE TABLE IF NOT EXISTS proofs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    filename TEXT,
+    uploaded_by TEXT,
+    uploaded_at INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    deposit_id TEXT,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance_after REAL NOT NULL,
+    timestamp INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    UNIQUE (user_id, seq)
+);
+CREATE INDEX IF NOT EXISTS transactions_user_time ON transactions (user_id, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    status_code INTEGER,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS idempotency_created ON idempotency_keys (created_at);
+
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY,
+    at INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    actor_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    target TEXT,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_actor_at ON audit_log (actor_id, at);
+"""
+
+EPOCH = datetime(1970, 1, 1)
+USER_COLUMNS = "id, username, email, role, created_at, is_active"
+DEPOSIT_FIELDS = (
+    "user_id", "amount", "proof_url", "status", "submitted_at", "approved_at",
+    "approved_by", "maturity_date", "interest_rate", "current_balance",
+)
+DEPOSIT_COLUMNS = ", ".join(("id",) + DEPOSIT_FIELDS)
+TRANSACTION_COLUMNS = "id, user_id, seq, deposit_id, type, amount, balance_after, timestamp, description"
+DEPOSIT_TIMES = ("submitted_at", "approved_at", "maturity_date")
+
+
+def _to_int(value: Optional[datetime]) -> Optional[int]:
+    return None if value is None else (naive_utc(value) - EPOCH) // timedelta(milliseconds=1)
+
+
+def _to_datetime(value: Optional[int]) -> Optional[datetime]:
+    return None if value is None else EPOCH + timedelta(milliseconds=value)
+
+
+@contextmanager
+def _write(conn: sqlite3.Connection):
+    """
+    Run statements as one transaction. IMMEDIATE takes the write lock up
+    front, so another process can't write between our reads and writes.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _key(value):
+    """Convert a cursor or filter value to its stored form."""
+    if isinstance(value, datetime):
+        return _to_int(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _document(row: sqlite3.Row, times: tuple[str, ...]) -> dict:
+    doc = dict(row)
+    doc["_id"] = ObjectId(doc.pop("id"))
+    for field in times:
+        if field in doc:
+            doc[field] = _to_datetime(doc[field])
+    return doc
+
+
+def _as_stored(doc: dict, times: tuple[str, ...]) -> dict:
+    # `doc` with its times as a read returns them: naive UTC, whole milliseconds
+    return {**doc, **{field: _to_datetime(_to_int(doc[field])) for field in times if field in doc}}
+
+
+def _user(row: Optional[sqlite3.Row]) -> Optional[dict]:
+    if row is None:
+        return None
+    user = _document(row, ("created_at",))
+    user["is_active"] = bool(user["is_active"])
+    return user
+
+
+def _deposit(row: Optional[sqlite3.Row]) -> Optional[dict]:
+    return _document(row, DEPOSIT_TIMES) if row is not None else None
+
+
+def _transaction(row: sqlite3.Row) -> dict:
+    return _document(row, ("timestamp",))
+
+
+class SqliteUserRepository(UserRepository):
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        return _user(self.conn.execute(
+            f"SELECT {USER_COLUMNS}, password_hash FROM users WHERE id = ?", (user_id,)
+        ).fetchone())
+
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        return _user(self.conn.execute(
+            f"SELECT {USER_COLUMNS}, password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone())
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        return _user(self.conn.execute(
+            f"SELECT {USER_COLUMNS}, password_hash FROM users WHERE email = ?", (email,)
+        ).fetchone())
+
+    async def create(self, user: dict) -> dict:
+        user = _as_stored({**user, "_id": ObjectId()}, ("created_at",))
+        self.conn.execute(
+            "INSERT INTO users (id, username, email, username_lower, email_lower, password_hash,"
+            " role, created_at, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(user["_id"]), user["username"], user["email"],
+                user["username"].lower(), user["email"].lower(), user["password_hash"],
+                user["role"], _to_int(user["created_at"]), int(user["is_active"]),
+            )
+        )
+        return user
+
+    async def search(
+        self,
+        q: Optional[str] = None,
+        match: Literal["prefix", "substring"] = "prefix",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        where, params = ["role = 'user'"], []
+        if q:
+            escaped = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = escaped + "%" if match == "prefix" else "%" + escaped + "%"
+            where.append("(username_lower LIKE ? ESCAPE '\\' OR email_lower LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        direction = "DESC" if order == "desc" else "ASC"
+        if after:
+            where.append(f"(created_at, id) {'<' if order == 'desc' else '>'} (?, ?)")
+            params += [_key(value) for value in after]
+        rows = self.conn.execute(
+            f"SELECT {USER_COLUMNS} FROM users WHERE {' AND '.join(where)}"
+            f" ORDER BY created_at {direction}, id {direction} LIMIT ?",
+            (*params, limit or -1)
+        )
+        return [_user(row) for row in rows]
+
+
+class SqliteDepositRepository(DepositRepository):
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    async def get(self, deposit_id: str) -> Optional[dict]:
+        return _deposit(self.conn.execute(
+            f"SELECT {DEPOSIT_COLUMNS} FROM deposits WHERE id = ?", (deposit_id,)
+        ).fetchone())
+
+    async def find_active(self, user_id: str, statuses: tuple[str, ...] = ACTIVE_STATUSES) -> Optional[dict]:
+        return _deposit(self.conn.execute(
+            f"SELECT {DEPOSIT_COLUMNS} FROM deposits WHERE user_id = ?"
+            f" AND status IN ({', '.join('?' * len(statuses))})",
+            (user_id, *statuses)
+        ).fetchone())
+
+    async def create(self, deposit: dict) -> dict:
+        deposit = _as_stored({**deposit, "_id": ObjectId()}, DEPOSIT_TIMES)
+        self.conn.execute(
+            f"INSERT INTO deposits ({DEPOSIT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(deposit["_id"]), deposit["user_id"], deposit["amount"], deposit["proof_url"],
+                deposit["status"], _to_int(deposit["submitted_at"]), _to_int(deposit["approved_at"]),
+                deposit["approved_by"], _to_int(deposit["maturity_date"]), deposit["interest_rate"],
+                deposit["current_balance"],
+            )
+        )
+        return deposit
+
+    async def update(self, deposit: dict, changes: dict) -> Optional[dict]:
+        columns = [field for field in changes if field in DEPOSIT_FIELDS]
+        cursor = self.conn.execute(
+            f"UPDATE deposits SET {', '.join(f'{c} = ?' for c in columns)}"
+            " WHERE id = ? AND status = ? AND approved_at IS ?",
+            (
+                *(_key(changes[c]) for c in columns),
+                str(deposit["_id"]), deposit["status"], _to_int(deposit["approved_at"]),
+            )
+        )
+        if cursor.rowcount == 0:
+            return None
+        return _as_stored({**deposit, **changes}, DEPOSIT_TIMES)
+
+    async def search(
+        self,
+        statuses: Optional[list[str]] = None,
+        user_id: Optional[str] = None,
+        ranges: Optional[DepositRanges] = None,
+        sort: Literal["submitted_at", "approved_at", "amount"] = "submitted_at",
+        order: Literal["asc", "desc"] = "desc",
+        limit: int = 0,
+        after: Optional[list] = None,
+    ) -> list[dict]:
+        where, params = [], []
+        if statuses:
+            where.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params += statuses
+        if user_id:
+            where.append("user_id = ?")
+            params.append(user_id)
+        for field, (low, high) in (ranges or {}).items():
+            if low is not None:
+                where.append(f"{field} >= ?")
+                params.append(_key(low))
+            if high is not None:
+                where.append(f"{field} <= ?")
+                params.append(_key(high))
+        if sort == "approved_at":
+            where.append("approved_at IS NOT NULL")
+        direction = "DESC" if order == "desc" else "ASC"
+        if after:
+            where.append(f"({sort}, id) {'<' if order == 'desc' else '>'} (?, ?)")
+            params += [_key(value) for value in after]
+        rows = self.conn.execute(
+            f"SELECT {DEPOSIT_COLUMNS} FROM deposits WHERE {' AND '.join(where) or '1'}"
+            f" ORDER BY {sort} {direction}, id {direction} LIMIT ?",
+            (*params, limit or -1)
+        )
+        return [_deposit(row) for row in rows]
+
+    async def save_proof(self, sha256: str, proof: dict):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO proofs (sha256, size, content_type, filename, uploaded_by, uploaded_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                sha256, proof["size"], proof["content_type"], proof.get("filename"),
+                proof.get("uploaded_by"), _to_int(proof["uploaded_at"]),
+            )
+        )
+
+    async def get_proof(self, sha256: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT sha256 AS _id, size, content_type, filename, uploaded_by, uploaded_at"
+            " FROM proofs WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), "uploaded_at": _to_datetime(row["uploaded_at"])}
+
+
+class SqliteTransactionRepository(TransactionRepository):
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    async def append(
+        self,
+        user_id: str,
+        entry_type: str,
+        amount: float,
+        description: str,
+        deposit_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> dict:
+        entry = {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "deposit_id": deposit_id,
+            "type": entry_type,
+            "amount": amount,
+            "timestamp": _to_datetime(_to_int(timestamp or utcnow())),
+            "description": description,
+        }
+        with _write(self.conn):
+            last = self.conn.execute(
+                "SELECT seq, balance_after FROM transactions WHERE user_id = ? ORDER BY seq DESC LIMIT 1",
+                (user_id,)
+            ).fetchone()
+            entry["seq"] = last["seq"] + 1 if last else 1
+            entry["balance_after"] = round((last["balance_after"] if last else 0.0) + signed_amount(entry_type, amount), 2)
+            self.conn.execute(
+                f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(entry["_id"]), user_id, entry["seq"], deposit_id, entry_type, amount,
+                    entry["balance_after"], _to_int(entry["timestamp"]), description,
+                )
+            )
+        return entry
+
+    async def history(self, user_id: str, limit: int = 0, after: Optional[list] = None) -> list[dict]:
+        if after:
+            rows = self.conn.execute(
+                f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE user_id = ? AND (timestamp, id) < (?, ?)"
+                " ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (user_id, *(_key(value) for value in after), limit or -1)
+            )
+        else:
+            rows = self.conn.execute(
+                f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE user_id = ?"
+                " ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (user_id, limit or -1)
+            )
+        return [_transaction(row) for row in rows]
+
+    async def balance_at(self, user_id: str, as_of: Optional[datetime] = None) -> float:
+        row = self.conn.execute(
+            "SELECT TOTAL(CASE WHEN type IN (?, ?) THEN amount ELSE -amount END)"
+            " FROM transactions WHERE user_id = ? AND timestamp <= ?",
+            (*CREDIT_TYPES, user_id, _to_int(as_of or utcnow()))
+        ).fetchone()
+        return round(row[0], 2)
+
+    async def entries(self, user_id: str, start: datetime, end: datetime) -> list[dict]:
+        rows = self.conn.execute(
+            f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE user_id = ? AND timestamp > ? AND timestamp <= ?"
+            " ORDER BY seq",
+            (user_id, _to_int(start), _to_int(end))
+        )
+        return [_transaction(row) for row in rows]
+
+
+class SqliteIdempotencyStore(IdempotencyStore):
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    async def reserve(self, record_id: str, fingerprint: str, now: datetime) -> Optional[dict]:
+        expired = _to_int(now - timedelta(hours=settings.idempotency_ttl_hours))
+        with _write(self.conn):
+            self.conn.execute("DELETE FROM idempotency_keys WHERE id = ? AND created_at < ?", (record_id, expired))
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (id, fingerprint, state, created_at) VALUES (?, ?, 'in_progress', ?)",
+                (record_id, fingerprint, _to_int(now))
+            ).rowcount
+        if inserted:
+            return None
+        row = self.conn.execute(
+            "SELECT fingerprint, state, created_at, status_code, body FROM idempotency_keys WHERE id = ?",
+            (record_id,)
+        ).fetchone()
+        record = dict(row)
+        record["created_at"] = _to_datetime(record["created_at"])
+        record["body"] = json.loads(record["body"]) if record["body"] is not None else None
+        return record
+
+    async def take_over(self, record_id: str, created_at: datetime, fingerprint: str, now: datetime) -> bool:
+        return self.conn.execute(
+            "UPDATE idempotency_keys SET fingerprint = ?, created_at = ?"
+            " WHERE id = ? AND state = 'in_progress' AND created_at = ?",
+            (fingerprint, _to_int(now), record_id, _to_int(created_at))
+        ).rowcount == 1
+
+    async def complete(self, record_id: str, record: dict):
+        self.conn.execute(
+            "UPDATE idempotency_keys SET fingerprint = ?, state = ?, status_code = ?, body = ? WHERE id = ?",
+            (record["fingerprint"], record["state"], record["status_code"], json.dumps(record["body"]), record_id)
+        )
+
+    async def release(self, record_id: str):
+        self.conn.execute("DELETE FROM idempotency_keys WHERE id = ?", (record_id,))
+
+
+class SqliteAuditLog(AuditLog):
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    async def insert_many(self, events: list[dict]) -> list[dict]:
+        # One transaction: either every event is stored or none is
+        with _write(self.conn):
+            self.conn.executemany(
+                "INSERT INTO audit_log (at, action, actor_id, role, target, details) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (_to_int(e["at"]), e["action"], e["actor_id"], e["role"], e["target"], json.dumps(e["details"], default=str))
+                    for e in events
+                ]
+            )
+        return []
+
+
+class SqliteRepositories(Repositories):
+    """
+    All repositories on one SQLite database file in WAL mode, which lets
+    readers proceed while a write is in progress.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, cached_statements=256)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        self.conn.executescript(SCHEMA)
+        self.users = SqliteUserRepository(self.conn)
+        self.deposits = SqliteDepositRepository(self.conn)
+        self.transactions = SqliteTransactionRepository(self.conn)
+        self.idempotency = SqliteIdempotencyStore(self.conn)
+        self.audit = SqliteAuditLog(self.conn)
+
+    async def close(self):
+        self.conn.close()
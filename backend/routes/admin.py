@@ -1,24 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from database import get_database
-from utils.auth import get_current_admin_user, get_password_hash
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from starlette.websockets import WebSocketState
+from repositories import get_repositories
+from utils.auth import get_current_admin_user, get_password_hash, get_user_from_token
 from models.user import UserCreate, UserResponse
 from models.deposit import DepositResponse
+from models.projection import LiabilityForecast
+from datetime import datetime, timedelta
 from bson import ObjectId
-from datetime import datetime
-from utils.interest import calculate_accrued_interest, is_deposit_mature, days_until_maturity
+import asyncio
+from utils.interest import calculate_accrued_interest, calculate_maturity_date, is_deposit_mature, days_until_maturity, next_accrual_change
+from utils.storage import FileRangeResponse, parse_range, proof_path
+from utils.events import bus, PENDING_TOPIC, RESYNC, emit_deposit_change, emit_pending_change
+from utils.projection import ProjectionMode, day_grid, project_deposits, elapsed_days, grid_dates
+from utils.versioning import bump, not_modified, user_scope, valid_until
+from utils.pagination import encode_cursor, decode_cursor
+from utils.encoding import encode_list
+from utils.audit import audit_log
+from utils.clock import SimulatedClock, get_clock, utcnow
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+import numpy as np
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+class ClockResponse(BaseModel):
+    now: datetime
+    simulated: bool
+    rate: float  # Simulated seconds per real second
+
+
+class ClockAdvance(BaseModel):
+    days: float = Field(0, ge=0)
+    hours: float = Field(0, ge=0)
+    seconds: float = Field(0, ge=0)
+
+
 @router.post("/users", response_model=UserResponse)
 async def create_user(user_data: UserCreate, current_admin: dict = Depends(get_current_admin_user)):
     """
     Create a new user account (admin only).
     """
-    db = get_database()
+    users = get_repositories().users
     
     # Check if username already exists
-    existing_user = await db.users.find_one({"username": user_data.username})
+    existing_user = await users.get_by_username(user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -26,7 +53,7 @@ async def create_user(user_data: UserCreate, current_admin: dict = Depends(get_c
         )
     
     # Check if email already exists
-    existing_email = await db.users.find_one({"email": user_data.email})
+    existing_email = await users.get_by_email(user_data.email)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,14 +64,25 @@ async def create_user(user_data: UserCreate, current_admin: dict = Depends(get_c
     user_doc = {
         "username": user_data.username,
         "email": user_data.email,
+        "username_lower": user_data.username.lower(),
+        "email_lower": user_data.email.lower(),
         "password_hash": get_password_hash(user_data.password),
         "role": user_data.role,
-        "created_at": datetime.utcnow(),
+        "created_at": utcnow(),
         "is_active": True
     }
     
-    result = await db.users.insert_one(user_doc)
-    user_doc["_id"] = result.inserted_id
+    user_doc = await users.create(user_doc)
+    bump("users")
+    await audit_log.record(
+        "create_user",
+        str(current_admin["_id"]),
+        "admin",
+        target=str(user_doc["_id"]),
+        critical=True,
+        username=user_doc["username"],
+        granted_role=user_doc["role"]
+    )
     
     return UserResponse(
         id=str(user_doc["_id"]),
@@ -57,14 +95,45 @@ async def create_user(user_data: UserCreate, current_admin: dict = Depends(get_c
 
 
 @router.get("/users", response_model=list[UserResponse])
-async def list_users(current_admin: dict = Depends(get_current_admin_user)):
+async def list_users(
+    request: Request,
+    response: Response,
+    q: Optional[str] = Query(None, min_length=1, max_length=100),
+    match: Literal["prefix", "substring"] = "prefix",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin_user)
+):
     """
-    Get list of all users (admin only).
+    Get list of users, optionally searched by username or email (admin only).
+    Results are sorted by created_at; with `limit`, returns one page and sets
+    `X-Next-Cursor` when more remain. Also served as MessagePack and/or
+    columns on request (see utils.encoding).
+    
+    Prefix searches use the index. A substring search cannot: it checks
+    users in created_at order until `limit` match, so it requires `limit`.
     """
-    db = get_database()
+    if q and match == "substring" and not limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Substring search scans users; pass a limit"
+        )
+    response.headers["Vary"] = "Accept"
+    cached = not_modified(request, response, "users")
+    if cached:
+        return cached
+    
     users = []
+    found = await get_repositories().users.search(
+        q,
+        match,
+        order,
+        limit or 0,
+        decode_cursor(cursor, datetime, ObjectId) if cursor else None
+    )
     
-    async for user in db.users.find({"role": "user"}):
+    for user in found:
         users.append(UserResponse(
             id=str(user["_id"]),
             username=user["username"],
@@ -74,37 +143,116 @@ async def list_users(current_admin: dict = Depends(get_current_admin_user)):
             is_active=user["is_active"]
         ))
     
-    return users
+    if limit and len(users) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([user["created_at"], user["_id"]])
+    
+    return encode_list(request, response, UserResponse, users)
+
+
+def _pending_deposit_response(deposit: dict) -> DepositResponse:
+    return DepositResponse(
+        id=str(deposit["_id"]),
+        user_id=deposit["user_id"],
+        amount=deposit["amount"],
+        proof_url=deposit["proof_url"],
+        status=deposit["status"],
+        submitted_at=deposit["submitted_at"],
+        approved_at=deposit.get("approved_at"),
+        maturity_date=deposit.get("maturity_date"),
+        current_balance=deposit["amount"],
+        days_remaining=None,
+        is_mature=False,
+        accrued_interest=0.0
+    )
 
 
 @router.get("/deposits/pending", response_model=list[DepositResponse])
-async def get_pending_deposits(current_admin: dict = Depends(get_current_admin_user)):
+async def get_pending_deposits(
+    request: Request,
+    response: Response,
+    current_admin: dict = Depends(get_current_admin_user)
+):
     """
     Get all pending deposit requests (admin only).
     """
-    db = get_database()
-    deposits = []
+    await audit_log.record("read_pending_deposits", str(current_admin["_id"]), "admin")
+    cached = not_modified(request, response, "deposits")
+    if cached:
+        return cached
     
-    async for deposit in db.deposits.find({"status": "pending"}):
-        # Get user info
-        user = await db.users.find_one({"_id": ObjectId(deposit["user_id"])})
-        
-        deposits.append(DepositResponse(
-            id=str(deposit["_id"]),
-            user_id=deposit["user_id"],
-            amount=deposit["amount"],
-            proof_url=deposit["proof_url"],
-            status=deposit["status"],
-            submitted_at=deposit["submitted_at"],
-            approved_at=deposit.get("approved_at"),
-            maturity_date=deposit.get("maturity_date"),
-            current_balance=deposit["amount"],
-            days_remaining=None,
-            is_mature=False,
-            accrued_interest=0.0
-        ))
+    pending = await get_repositories().deposits.search(statuses=["pending"], order="asc")
+    return [_pending_deposit_response(deposit) for deposit in pending]
+
+
+@router.websocket("/deposits/pending/feed")
+async def pending_deposits_feed(websocket: WebSocket, token: str):
+    """
+    Live feed of the pending queue (admin only, token passed as a query parameter).
+    Sends the current pending set once, then only insert and remove events.
+    An admin who falls too far behind gets a fresh snapshot instead.
+    """
+    try:
+        admin = await get_user_from_token(token)
+    except HTTPException:
+        admin = None
+    if not admin or admin.get("role") != "admin":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    await audit_log.record("stream_pending_deposits", str(admin["_id"]), "admin")
     
-    return deposits
+    # Subscribe before reading the snapshot so no change can fall in between
+    queue = bus.subscribe(PENDING_TOPIC)
+    
+    async def send_snapshot() -> set[str]:
+        snapshot = [
+            _pending_deposit_response(deposit)
+            for deposit in await get_repositories().deposits.search(statuses=["pending"], order="asc")
+        ]
+        await websocket.send_json(jsonable_encoder({"type": "snapshot", "deposits": snapshot}))
+        return {deposit.id for deposit in snapshot}
+    
+    async def forward_changes(known: set[str]):
+        while True:
+            event = await queue.get()
+            if event is RESYNC:
+                known = await send_snapshot()  # Events were dropped while we lagged
+                continue
+            if event["type"] == "insert":
+                deposit = event["deposit"]
+                if str(deposit["_id"]) in known:
+                    continue
+                known.add(str(deposit["_id"]))
+                message = {"type": "insert", "deposit": _pending_deposit_response(deposit)}
+            else:
+                if event["deposit_id"] not in known:
+                    continue
+                known.discard(event["deposit_id"])
+                message = event
+            await websocket.send_json(jsonable_encoder(message))
+    
+    async def ignore_messages():
+        while True:
+            await websocket.receive_text()  # Client messages are ignored
+    
+    tasks = []
+    try:
+        known = await send_snapshot()
+        tasks = [asyncio.create_task(forward_changes(known)), asyncio.create_task(ignore_messages())]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()  # The client left, or sending failed
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Pending deposits feed failed: {e}")
+        if websocket.application_state == WebSocketState.CONNECTED:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        for task in tasks:
+            task.cancel()
+        bus.unsubscribe(PENDING_TOPIC, queue)
 
 
 @router.post("/deposits/{deposit_id}/approve")
@@ -112,10 +260,10 @@ async def approve_deposit(deposit_id: str, current_admin: dict = Depends(get_cur
     """
     Approve a deposit request (admin only).
     """
-    db = get_database()
+    repos = get_repositories()
     
     # Find deposit
-    deposit = await db.deposits.find_one({"_id": ObjectId(deposit_id)})
+    deposit = await repos.deposits.get(deposit_id)
     if not deposit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -129,34 +277,45 @@ async def approve_deposit(deposit_id: str, current_admin: dict = Depends(get_cur
         )
     
     # Update deposit
-    approved_at = datetime.utcnow()
-    from utils.interest import calculate_maturity_date
+    approved_at = utcnow()
     maturity_date = calculate_maturity_date(approved_at)
     
-    await db.deposits.update_one(
-        {"_id": ObjectId(deposit_id)},
-        {
-            "$set": {
-                "status": "approved",
-                "approved_at": approved_at,
-                "approved_by": str(current_admin["_id"]),
-                "maturity_date": maturity_date,
-                "current_balance": deposit["amount"]
-            }
-        }
-    )
-    
-    # Create transaction record
-    transaction = {
-        "user_id": deposit["user_id"],
-        "deposit_id": deposit_id,
-        "type": "deposit",
-        "amount": deposit["amount"],
-        "balance_after": deposit["amount"],
-        "timestamp": approved_at,
-        "description": f"Deposit approved - Principal: ${deposit['amount']}"
+    changes = {
+        "status": "approved",
+        "approved_at": approved_at,
+        "approved_by": str(current_admin["_id"]),
+        "maturity_date": maturity_date,
+        "current_balance": deposit["amount"]
     }
-    await db.transactions.insert_one(transaction)
+    # Compare-and-set, so only one of two concurrent approvals credits the ledger
+    deposit = await repos.deposits.update(deposit, changes)
+    if deposit is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Deposit was changed by another request"
+        )
+    
+    # Record the principal in the user's ledger
+    await repos.transactions.append(
+        deposit["user_id"],
+        "deposit",
+        deposit["amount"],
+        f"Deposit approved - Principal: ${deposit['amount']}",
+        deposit_id=deposit_id,
+        timestamp=approved_at
+    )
+    bump(user_scope(deposit["user_id"]), "deposits")
+    emit_deposit_change(deposit)
+    emit_pending_change(deposit)
+    await audit_log.record(
+        "approve_deposit",
+        str(current_admin["_id"]),
+        "admin",
+        target=deposit_id,
+        critical=True,
+        user_id=deposit["user_id"],
+        amount=deposit["amount"]
+    )
     
     return {"message": "Deposit approved successfully", "maturity_date": maturity_date}
 
@@ -166,10 +325,10 @@ async def reject_deposit(deposit_id: str, current_admin: dict = Depends(get_curr
     """
     Reject a deposit request (admin only).
     """
-    db = get_database()
+    repos = get_repositories()
     
     # Find deposit
-    deposit = await db.deposits.find_one({"_id": ObjectId(deposit_id)})
+    deposit = await repos.deposits.get(deposit_id)
     if not deposit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,28 +342,120 @@ async def reject_deposit(deposit_id: str, current_admin: dict = Depends(get_curr
         )
     
     # Update deposit
-    await db.deposits.update_one(
-        {"_id": ObjectId(deposit_id)},
-        {
-            "$set": {
-                "status": "rejected",
-                "approved_by": str(current_admin["_id"])
-            }
-        }
+    changes = {
+        "status": "rejected",
+        "approved_by": str(current_admin["_id"])
+    }
+    # Compare-and-set, so an approval racing this rejection wins or loses whole
+    deposit = await repos.deposits.update(deposit, changes)
+    if deposit is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Deposit was changed by another request"
+        )
+    bump(user_scope(deposit["user_id"]), "deposits")
+    emit_deposit_change(deposit)
+    emit_pending_change(deposit)
+    await audit_log.record(
+        "reject_deposit",
+        str(current_admin["_id"]),
+        "admin",
+        target=deposit_id,
+        critical=True,
+        user_id=deposit["user_id"],
+        amount=deposit["amount"]
     )
     
     return {"message": "Deposit rejected successfully"}
 
 
+@router.get("/deposits/forecast", response_model=LiabilityForecast)
+async def get_liability_forecast(
+    mode: ProjectionMode = "rollover",
+    horizon_days: int = Query(360, ge=1, le=3650),
+    step_days: int = Query(30, ge=1),
+    current_admin: dict = Depends(get_current_admin_user)
+):
+    """
+    Project total liability and payouts across all approved deposits (admin only).
+    """
+    await audit_log.record("read_liability_forecast", str(current_admin["_id"]), "admin")
+    principals, rates, cycle_starts = [], [], []
+    
+    for deposit in await get_repositories().deposits.search(statuses=["approved"]):
+        principals.append(deposit["amount"])
+        rates.append(deposit["interest_rate"])
+        cycle_starts.append(deposit["approved_at"])
+    
+    now = utcnow()
+    grid = day_grid(horizon_days, step_days)
+    projection = project_deposits(principals, rates, elapsed_days(cycle_starts, now), grid, mode)
+    
+    cumulative_payout = projection["cumulative_payout"].sum(axis=0)
+    return LiabilityForecast(
+        mode=mode,
+        deposit_count=len(principals),
+        days=grid.tolist(),
+        dates=grid_dates(now, grid),
+        total_balance=projection["balance"].sum(axis=0).round(2).tolist(),
+        cumulative_payout=cumulative_payout.round(2).tolist(),
+        period_payout=np.diff(cumulative_payout, prepend=0.0).round(2).tolist()
+    )
+
+
+SORT_KEY_TYPES = {"submitted_at": datetime, "approved_at": datetime, "amount": (int, float)}
+
+
 @router.get("/deposits", response_model=list[DepositResponse])
-async def get_all_deposits(current_admin: dict = Depends(get_current_admin_user)):
+async def get_all_deposits(
+    request: Request,
+    response: Response,
+    status_: Optional[list[Literal["pending", "approved", "rejected", "withdrawn"]]] = Query(None, alias="status"),
+    user_id: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+    approved_from: Optional[datetime] = None,
+    approved_to: Optional[datetime] = None,
+    sort: Literal["submitted_at", "approved_at", "amount"] = "submitted_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin_user)
+):
     """
     Get all deposits with filters (admin only).
+    Sorting by approved_at only returns deposits that have been approved. With
+    `limit`, returns one page and sets `X-Next-Cursor` when more remain.
+    Also served as MessagePack and/or columns on request (see utils.encoding).
     """
-    db = get_database()
+    after = decode_cursor(cursor, SORT_KEY_TYPES[sort], ObjectId) if cursor else None
+    
+    await audit_log.record("read_deposits", str(current_admin["_id"]), "admin", user_id=user_id)
+    response.headers["Vary"] = "Accept"
+    cached = not_modified(request, response, "deposits", expires=True)
+    if cached:
+        return cached
+    
     deposits = []
+    changes_at = None
     
-    async for deposit in db.deposits.find().sort("submitted_at", -1):
+    found = await get_repositories().deposits.search(
+        statuses=status_,
+        user_id=user_id,
+        ranges={
+            "amount": (min_amount, max_amount),
+            "submitted_at": (submitted_from, submitted_to),
+            "approved_at": (approved_from, approved_to)
+        },
+        sort=sort,
+        order=order,
+        limit=limit or 0,
+        after=after
+    )
+    
+    for deposit in found:
         accrued_interest = 0.0
         is_mature = False
         days_remaining = None
@@ -219,6 +470,8 @@ async def get_all_deposits(current_admin: dict = Depends(get_current_admin_user)
             current_balance = deposit["amount"] + accrued_interest
             is_mature = is_deposit_mature(deposit["approved_at"])
             days_remaining = days_until_maturity(deposit["approved_at"])
+            next_change = next_accrual_change(deposit["approved_at"])
+            changes_at = min(changes_at or next_change, next_change)
         
         deposits.append(DepositResponse(
             id=str(deposit["_id"]),
@@ -235,4 +488,67 @@ async def get_all_deposits(current_admin: dict = Depends(get_current_admin_user)
             accrued_interest=accrued_interest
         ))
     
-    return deposits
+    if limit and len(deposits) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([deposit[sort], deposit["_id"]])
+    
+    valid_until(response, changes_at)
+    return encode_list(request, response, DepositResponse, deposits)
+
+
+@router.get("/proofs/{sha256}")
+async def download_proof(sha256: str, request: Request, current_admin: dict = Depends(get_current_admin_user)):
+    """
+    Download a deposit proof (admin only).
+    Supports single byte-range requests for resumable and partial downloads.
+    """
+    path = proof_path(sha256)
+    
+    proof = await get_repositories().deposits.get_proof(sha256)
+    if not proof:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proof not found"
+        )
+    
+    byte_range = parse_range(request.headers.get("range"), proof["size"])
+    await audit_log.record("download_proof", str(current_admin["_id"]), "admin", target=sha256)
+    return FileRangeResponse(path, proof["size"], proof["content_type"], byte_range)
+
+
+def _clock_response() -> ClockResponse:
+    clock = get_clock()
+    simulated = isinstance(clock, SimulatedClock)
+    return ClockResponse(now=clock.now(), simulated=simulated, rate=clock.rate if simulated else 1.0)
+
+
+@router.get("/clock", response_model=ClockResponse)
+async def get_clock_time(current_admin: dict = Depends(get_current_admin_user)):
+    """
+    Get the server's business time (admin only).
+    """
+    return _clock_response()
+
+
+@router.post("/clock/advance", response_model=ClockResponse)
+async def advance_clock(advance: ClockAdvance, current_admin: dict = Depends(get_current_admin_user)):
+    """
+    Fast-forward the simulated clock, e.g. to a maturity date (admin only).
+    Only available when the server runs with CLOCK=simulated.
+    """
+    clock = get_clock()
+    if not isinstance(clock, SimulatedClock):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The server clock is not simulated"
+        )
+    
+    delta = timedelta(days=advance.days, hours=advance.hours, seconds=advance.seconds)
+    clock.advance(delta)
+    await audit_log.record(
+        "advance_clock",
+        str(current_admin["_id"]),
+        "admin",
+        critical=True,
+        seconds=delta.total_seconds()
+    )
+    return _clock_response()
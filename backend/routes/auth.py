@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
-from database import get_database
+from repositories import get_repositories
 from utils.auth import verify_password, create_access_token, get_password_hash
 from models.user import UserInDB
 from bson import ObjectId
@@ -27,10 +27,8 @@ async def login(credentials: LoginRequest):
     Login endpoint for both admin and regular users.
     Returns JWT token and user information.
     """
-    db = get_database()
-    
     # Find user by username
-    user = await db.users.find_one({"username": credentials.username})
+    user = await get_repositories().users.get_by_username(credentials.username)
     
     if not user:
         raise HTTPException(
@@ -1,18 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from database import get_database
-from utils.auth import get_current_active_user
-from models.deposit import DepositCreate, DepositResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from repositories import get_repositories
+from utils.auth import create_stream_token, get_current_active_user, get_stream_user
+from models.deposit import DepositCreate, DepositResponse, ProofUploadResponse
 from models.transaction import TransactionResponse
+from models.user import UserResponse
+from models.projection import DepositProjection, ProjectionPoint, PayoutEvent
+from datetime import datetime, timedelta
 from bson import ObjectId
-from datetime import datetime
+import asyncio
 from utils.interest import (
     calculate_accrued_interest,
     calculate_current_balance,
     is_deposit_mature,
     days_until_maturity,
-    calculate_maturity_date
+    calculate_maturity_date,
+    next_accrual_change
 )
-from pydantic import BaseModel
+from utils.pagination import encode_cursor, decode_cursor
+from utils.encoding import encode_list
+from utils.clock import naive_utc, utcnow
+from utils.storage import store_upload
+from utils.projection import ProjectionMode, day_grid, project_deposits, payout_days, elapsed_days, grid_dates
+from utils.events import bus, user_topic, emit_deposit_change, emit_pending_change, format_sse
+from utils.versioning import bump, not_modified, user_scope, valid_until
+from utils.idempotency import idempotent
+from utils.audit import audit_log
+from config import settings
+from pydantic import BaseModel, NonNegativeInt
+from typing import Optional
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -28,6 +44,118 @@ class WithdrawRequest(BaseModel):
     withdraw_type: str  # "interest" or "full"
 
 
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int  # Seconds; only needed to open the stream
+
+
+class StatementResponse(BaseModel):
+    start: datetime
+    end: datetime
+    opening_balance: float
+    closing_balance: float
+    transactions: list[TransactionResponse]
+
+
+class AccountResponse(BaseModel):
+    profile: UserResponse
+    deposit: Optional[DepositResponse] = None
+    balance: BalanceResponse
+    recent_transactions: list[TransactionResponse]
+
+
+def _deposit_response(deposit: dict) -> DepositResponse:
+    """Build the API view of a deposit, with interest accrued to now."""
+    accrued_interest = 0.0
+    is_mature = False
+    days_remaining = None
+    current_balance = deposit["amount"]
+    
+    if deposit["status"] == "approved" and deposit.get("approved_at"):
+        accrued_interest = calculate_accrued_interest(
+            deposit["amount"],
+            deposit["interest_rate"],
+            deposit["approved_at"]
+        )
+        current_balance = deposit["amount"] + accrued_interest
+        is_mature = is_deposit_mature(deposit["approved_at"])
+        days_remaining = days_until_maturity(deposit["approved_at"])
+    
+    return DepositResponse(
+        id=str(deposit["_id"]),
+        user_id=deposit["user_id"],
+        amount=deposit["amount"],
+        proof_url=deposit["proof_url"],
+        status=deposit["status"],
+        submitted_at=deposit["submitted_at"],
+        approved_at=deposit.get("approved_at"),
+        maturity_date=deposit.get("maturity_date"),
+        current_balance=current_balance,
+        days_remaining=days_remaining,
+        is_mature=is_mature,
+        accrued_interest=accrued_interest
+    )
+
+
+def _balance_response(deposit: Optional[dict]) -> BalanceResponse:
+    """Build the balance view from the user's approved deposit, if any."""
+    if not deposit:
+        return BalanceResponse(
+            principal=0.0,
+            accrued_interest=0.0,
+            total_balance=0.0,
+            has_active_deposit=False
+        )
+    
+    accrued_interest = calculate_accrued_interest(
+        deposit["amount"],
+        deposit["interest_rate"],
+        deposit["approved_at"]
+    )
+    return BalanceResponse(
+        principal=deposit["amount"],
+        accrued_interest=accrued_interest,
+        total_balance=deposit["amount"] + accrued_interest,
+        has_active_deposit=True
+    )
+
+
+def _account_response(
+    profile: dict,
+    deposit: Optional[dict],
+    transactions: list[dict]
+) -> tuple[AccountResponse, Optional[datetime]]:
+    """
+    Build the dashboard view of an account.
+
+    Returns:
+        The response and when its accrued interest next changes (None if it
+        only changes on writes)
+    """
+    approved = deposit if deposit and deposit["status"] == "approved" else None
+    result = AccountResponse(
+        profile=UserResponse(**profile),
+        deposit=_deposit_response(deposit) if deposit else None,
+        balance=_balance_response(approved),
+        recent_transactions=[_transaction_response(txn) for txn in transactions]
+    )
+    return result, next_accrual_change(approved["approved_at"]) if approved else None
+
+
+def _transaction_response(txn: dict) -> TransactionResponse:
+    return TransactionResponse(
+        id=str(txn["_id"]),
+        user_id=txn["user_id"],
+        seq=txn.get("seq"),
+        deposit_id=txn.get("deposit_id"),
+        type=txn["type"],
+        amount=txn["amount"],
+        balance_after=txn["balance_after"],
+        timestamp=txn["timestamp"],
+        description=txn["description"]
+    )
+
+
 @router.get("/profile")
 async def get_profile(current_user: dict = Depends(get_current_active_user)):
     """
@@ -43,20 +171,137 @@ async def get_profile(current_user: dict = Depends(get_current_active_user)):
     }
 
 
+@router.get("/account", response_model=AccountResponse)
+async def get_account_state(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get everything the dashboard shows - profile, current deposit, balance
+    and recent transactions. With MongoDB the deposit and transactions are a
+    single indexed read of the user's account document.
+    """
+    user_id = str(current_user["_id"])
+    scope = user_scope(user_id)
+    
+    await audit_log.record("read_account", user_id, current_user["role"])
+    cached = not_modified(request, response, scope, expires=True)
+    if cached:
+        return cached
+    
+    account = await get_repositories().account(user_id)
+    
+    result, changes_at = _account_response(
+        {**current_user, "id": user_id},
+        account["active_deposit"],
+        account["recent_transactions"]
+    )
+    valid_until(response, changes_at)
+    return result
+
+
+@router.get("/dashboard", response_model=AccountResponse)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get profile, current deposit, balance and the latest `limit` transactions
+    in one response. Authenticates once and runs the deposit and transaction
+    queries concurrently; the balance is derived from the same deposit.
+    When more transactions remain, `X-Next-Cursor` continues the history
+    through /user/transactions.
+    """
+    repos = get_repositories()
+    user_id = str(current_user["_id"])
+    scope = user_scope(user_id)
+    
+    await audit_log.record("read_dashboard", user_id, current_user["role"])
+    cached = not_modified(request, response, scope, expires=True)
+    if cached:
+        return cached
+    
+    deposit, transactions = await asyncio.gather(
+        repos.deposits.find_active(user_id),
+        repos.transactions.history(user_id, limit)
+    )
+    
+    result, changes_at = _account_response(
+        {**current_user, "id": user_id},
+        deposit,
+        transactions
+    )
+    if len(transactions) == limit:
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last["timestamp"], last["_id"]])
+    valid_until(response, changes_at)
+    return result
+
+
+@router.post("/deposit/proof", response_model=ProofUploadResponse)
+async def upload_proof(file: UploadFile = File(...), current_user: dict = Depends(get_current_active_user)):
+    """
+    Upload a deposit proof document.
+    Files are streamed to storage in chunks and deduplicated by content hash;
+    use the returned proof_url when submitting the deposit.
+    """
+    content_type = file.content_type or "application/octet-stream"
+    
+    if content_type not in settings.proof_allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported proof type. Allowed: {', '.join(settings.proof_allowed_types)}"
+        )
+    
+    sha256, size = await store_upload(file)
+    
+    await get_repositories().deposits.save_proof(
+        sha256,
+        {
+            "size": size,
+            "content_type": content_type,
+            "filename": file.filename,
+            "uploaded_by": str(current_user["_id"]),
+            "uploaded_at": utcnow()
+        }
+    )
+    
+    return ProofUploadResponse(
+        proof_url=f"/admin/proofs/{sha256}",
+        sha256=sha256,
+        size=size,
+        content_type=content_type
+    )
+
+
 @router.post("/deposit", response_model=DepositResponse)
-async def submit_deposit(deposit_data: DepositCreate, current_user: dict = Depends(get_current_active_user)):
+async def submit_deposit(
+    deposit_data: DepositCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: dict = Depends(get_current_active_user)
+):
     """
     Submit a deposit request with proof.
     User can only have one deposit at a time (pending or approved).
+    Retries with the same Idempotency-Key get the original response.
     """
-    db = get_database()
+    return await idempotent(
+        idempotency_key,
+        f"{current_user['_id']}:deposit",
+        deposit_data,
+        lambda: _submit_deposit(deposit_data, current_user)
+    )
+
+
+async def _submit_deposit(deposit_data: DepositCreate, current_user: dict) -> DepositResponse:
+    deposits = get_repositories().deposits
     user_id = str(current_user["_id"])
     
     # Check if user already has a pending or approved deposit
-    existing_deposit = await db.deposits.find_one({
-        "user_id": user_id,
-        "status": {"$in": ["pending", "approved"]}
-    })
+    existing_deposit = await deposits.find_active(user_id)
     
     if existing_deposit:
         raise HTTPException(
@@ -70,7 +315,7 @@ async def submit_deposit(deposit_data: DepositCreate, current_user: dict = Depen
         "amount": deposit_data.amount,
         "proof_url": deposit_data.proof_url,
         "status": "pending",
-        "submitted_at": datetime.utcnow(),
+        "submitted_at": utcnow(),
         "approved_at": None,
         "approved_by": None,
         "maturity_date": None,
@@ -78,8 +323,10 @@ async def submit_deposit(deposit_data: DepositCreate, current_user: dict = Depen
         "current_balance": 0.0
     }
     
-    result = await db.deposits.insert_one(deposit_doc)
-    deposit_doc["_id"] = result.inserted_id
+    deposit_doc = await deposits.create(deposit_doc)
+    bump(user_scope(user_id), "deposits")
+    emit_deposit_change(deposit_doc)
+    emit_pending_change(deposit_doc)
     
     return DepositResponse(
         id=str(deposit_doc["_id"]),
@@ -98,101 +345,145 @@ async def submit_deposit(deposit_data: DepositCreate, current_user: dict = Depen
 
 
 @router.get("/deposit/current", response_model=DepositResponse | None)
-async def get_current_deposit(current_user: dict = Depends(get_current_active_user)):
+async def get_current_deposit(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user)
+):
     """
     Get current active deposit (pending or approved).
     """
-    db = get_database()
     user_id = str(current_user["_id"])
+    scope = user_scope(user_id)
     
-    deposit = await db.deposits.find_one({
-        "user_id": user_id,
-        "status": {"$in": ["pending", "approved"]}
-    })
+    await audit_log.record("read_current_deposit", user_id, current_user["role"])
+    cached = not_modified(request, response, scope, expires=True)
+    if cached:
+        return cached
+    
+    deposit = await get_repositories().deposits.find_active(user_id)
     
     if not deposit:
         return None
     
-    accrued_interest = 0.0
-    is_mature = False
-    days_remaining = None
-    current_balance = deposit["amount"]
-    
+    changes_at = None
     if deposit["status"] == "approved" and deposit.get("approved_at"):
-        accrued_interest = calculate_accrued_interest(
-            deposit["amount"],
-            deposit["interest_rate"],
-            deposit["approved_at"]
-        )
-        current_balance = deposit["amount"] + accrued_interest
-        is_mature = is_deposit_mature(deposit["approved_at"])
-        days_remaining = days_until_maturity(deposit["approved_at"])
+        changes_at = next_accrual_change(deposit["approved_at"])
     
-    return DepositResponse(
-        id=str(deposit["_id"]),
-        user_id=deposit["user_id"],
-        amount=deposit["amount"],
-        proof_url=deposit["proof_url"],
-        status=deposit["status"],
-        submitted_at=deposit["submitted_at"],
-        approved_at=deposit.get("approved_at"),
-        maturity_date=deposit.get("maturity_date"),
-        current_balance=current_balance,
-        days_remaining=days_remaining,
-        is_mature=is_mature,
-        accrued_interest=accrued_interest
-    )
+    valid_until(response, changes_at)
+    return _deposit_response(deposit)
 
 
-@router.get("/balance", response_model=BalanceResponse)
-async def get_balance(current_user: dict = Depends(get_current_active_user)):
+@router.get("/deposit/projection", response_model=DepositProjection)
+async def get_deposit_projection(
+    mode: ProjectionMode = "rollover",
+    horizon_days: int = Query(360, ge=1, le=3650),
+    step_days: int = Query(30, ge=1),
+    days: Optional[list[NonNegativeInt]] = Query(None),
+    current_user: dict = Depends(get_current_active_user)
+):
     """
-    Get current balance with accrued interest.
+    Project the payout schedule of the current approved deposit.
+    "rollover" takes the interest at each maturity; "full" withdraws everything at the first one.
     """
-    db = get_database()
     user_id = str(current_user["_id"])
+    await audit_log.record("read_projection", user_id, current_user["role"])
     
-    deposit = await db.deposits.find_one({
-        "user_id": user_id,
-        "status": "approved"
-    })
+    deposit = await get_repositories().deposits.find_active(user_id, ("approved",))
     
     if not deposit:
-        return BalanceResponse(
-            principal=0.0,
-            accrued_interest=0.0,
-            total_balance=0.0,
-            has_active_deposit=False
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No active deposit found"
         )
     
-    accrued_interest = calculate_accrued_interest(
-        deposit["amount"],
-        deposit["interest_rate"],
-        deposit["approved_at"]
+    now = utcnow()
+    grid = day_grid(horizon_days, step_days, days)
+    projection = project_deposits(
+        [deposit["amount"]],
+        [deposit["interest_rate"]],
+        elapsed_days([deposit["approved_at"]], now),
+        grid,
+        mode
     )
     
-    return BalanceResponse(
+    first_day = int(projection["first_payout_day"][0])
+    payouts = []
+    for i, day in enumerate(payout_days(first_day, horizon_days, mode)):
+        payouts.append(PayoutEvent(
+            day=int(day),
+            date=now + timedelta(days=int(day)),
+            amount=float(projection["first_payout"][0] if i == 0 else projection["later_payout"][0])
+        ))
+    
+    return DepositProjection(
+        deposit_id=str(deposit["_id"]),
+        mode=mode,
         principal=deposit["amount"],
-        accrued_interest=accrued_interest,
-        total_balance=deposit["amount"] + accrued_interest,
-        has_active_deposit=True
+        interest_rate=deposit["interest_rate"],
+        schedule=[
+            ProjectionPoint(
+                day=int(day),
+                date=date,
+                accrued_interest=float(projection["accrued_interest"][0, j]),
+                balance=float(projection["balance"][0, j]),
+                cumulative_payout=float(projection["cumulative_payout"][0, j])
+            )
+            for j, (day, date) in enumerate(zip(grid, grid_dates(now, grid)))
+        ],
+        payouts=payouts
     )
 
 
+@router.get("/balance", response_model=BalanceResponse)
+async def get_balance(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get current balance with accrued interest.
+    """
+    user_id = str(current_user["_id"])
+    scope = user_scope(user_id)
+    
+    await audit_log.record("read_balance", user_id, current_user["role"])
+    cached = not_modified(request, response, scope, expires=True)
+    if cached:
+        return cached
+    
+    deposit = await get_repositories().deposits.find_active(user_id, ("approved",))
+    
+    changes_at = next_accrual_change(deposit["approved_at"]) if deposit else None
+    valid_until(response, changes_at)
+    return _balance_response(deposit)
+
+
 @router.post("/withdraw")
-async def withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict = Depends(get_current_active_user)):
+async def withdraw_funds(
+    withdraw_req: WithdrawRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: dict = Depends(get_current_active_user)
+):
     """
     Request withdrawal (only available after 90 days).
     User can withdraw interest only or full amount (principal + interest).
+    Retries with the same Idempotency-Key get the original response.
     """
-    db = get_database()
+    return await idempotent(
+        idempotency_key,
+        f"{current_user['_id']}:withdraw",
+        withdraw_req,
+        lambda: _withdraw_funds(withdraw_req, current_user)
+    )
+
+
+async def _withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict) -> dict:
+    repos = get_repositories()
     user_id = str(current_user["_id"])
     
     # Find approved deposit
-    deposit = await db.deposits.find_one({
-        "user_id": user_id,
-        "status": "approved"
-    })
+    deposit = await repos.deposits.find_active(user_id, ("approved",))
     
     if not deposit:
         raise HTTPException(
@@ -208,11 +499,16 @@ async def withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict = Dep
             detail=f"Withdrawal not available yet. {days_left} days remaining until maturity."
         )
     
+    # One reading of the clock for the interest, the new accrual period and
+    # the ledger entries, so they agree even on a fast simulated clock
+    now = utcnow()
+    
     # Calculate accrued interest
     accrued_interest = calculate_accrued_interest(
         deposit["amount"],
         deposit["interest_rate"],
-        deposit["approved_at"]
+        deposit["approved_at"],
+        as_of=now
     )
     
     withdrawal_amount = 0.0
@@ -224,15 +520,10 @@ async def withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict = Dep
         description = f"Interest withdrawal: ${accrued_interest:.2f}"
         
         # Keep deposit active but reset the approval date for new interest accrual
-        await db.deposits.update_one(
-            {"_id": deposit["_id"]},
-            {
-                "$set": {
-                    "approved_at": datetime.utcnow(),
-                    "maturity_date": calculate_maturity_date(datetime.utcnow())
-                }
-            }
-        )
+        changes = {
+            "approved_at": now,
+            "maturity_date": calculate_maturity_date(now)
+        }
         
     elif withdraw_req.withdraw_type == "full":
         # Withdraw principal + interest (close deposit)
@@ -240,27 +531,41 @@ async def withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict = Dep
         description = f"Full withdrawal: Principal ${deposit['amount']:.2f} + Interest ${accrued_interest:.2f}"
         
         # Mark deposit as completed/withdrawn
-        await db.deposits.update_one(
-            {"_id": deposit["_id"]},
-            {"$set": {"status": "withdrawn"}}
-        )
+        changes = {"status": "withdrawn"}
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid withdrawal type. Use 'interest' or 'full'."
         )
+    # Compare-and-set, so only one of two concurrent withdrawals pays out
+    updated = await repos.deposits.update(deposit, changes)
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Deposit was changed by another request"
+        )
     
-    # Create transaction record
-    transaction = {
-        "user_id": user_id,
-        "deposit_id": str(deposit["_id"]),
-        "type": "withdrawal",
-        "amount": withdrawal_amount,
-        "balance_after": 0.0 if withdraw_req.withdraw_type == "full" else deposit["amount"],
-        "timestamp": datetime.utcnow(),
-        "description": description
-    }
-    await db.transactions.insert_one(transaction)
+    # Credit the accrued interest, then debit the withdrawal, so the ledger
+    # balance always equals the principal still held
+    if accrued_interest > 0:
+        await repos.transactions.append(
+            user_id,
+            "interest_accrual",
+            accrued_interest,
+            f"Interest accrued: ${accrued_interest:.2f}",
+            deposit_id=str(deposit["_id"]),
+            timestamp=now
+        )
+    await repos.transactions.append(
+        user_id,
+        "withdrawal",
+        withdrawal_amount,
+        description,
+        deposit_id=str(deposit["_id"]),
+        timestamp=now
+    )
+    bump(user_scope(user_id), "deposits")
+    emit_deposit_change(updated)
     
     return {
         "message": "Withdrawal successful",
@@ -270,25 +575,109 @@ async def withdraw_funds(withdraw_req: WithdrawRequest, current_user: dict = Dep
     }
 
 
+@router.post("/events/token", response_model=StreamTokenResponse)
+async def create_events_token(current_user: dict = Depends(get_current_active_user)):
+    """
+    Get a short-lived token for opening /user/events from a browser
+    EventSource, which cannot send an Authorization header.
+    """
+    return StreamTokenResponse(
+        token=create_stream_token(str(current_user["_id"])),
+        expires_in=settings.sse_token_seconds
+    )
+
+
+@router.get("/events")
+async def stream_events(current_user: dict = Depends(get_stream_user)):
+    """
+    Server-Sent Events stream of changes to the user's deposits.
+    Replaces polling /user/deposit/current and /user/balance. Authenticate
+    with a Bearer header, or with `?token=` from POST /user/events/token.
+    A `resync` event means updates were dropped and state should be reloaded.
+    """
+    topic = user_topic(str(current_user["_id"]))
+    await audit_log.record("stream_events", str(current_user["_id"]), current_user["role"])
+    queue = bus.subscribe(topic)
+    
+    async def event_stream():
+        try:
+            yield f"retry: {settings.sse_retry_ms}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.sse_keepalive_seconds)
+                    yield format_sse(event)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            bus.unsubscribe(topic, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/transactions", response_model=list[TransactionResponse])
-async def get_transactions(current_user: dict = Depends(get_current_active_user)):
+async def get_transactions(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_active_user)
+):
     """
-    Get transaction history for the current user.
+    Get transaction history for the current user, newest first.
+    With `limit`, returns one page and sets `X-Next-Cursor` when more remain;
+    older pages are read from the archive transparently. Also served as
+    MessagePack and/or columns on request (see utils.encoding).
     """
-    db = get_database()
     user_id = str(current_user["_id"])
     
-    transactions = []
-    async for txn in db.transactions.find({"user_id": user_id}).sort("timestamp", -1):
-        transactions.append(TransactionResponse(
-            id=str(txn["_id"]),
-            user_id=txn["user_id"],
-            deposit_id=txn.get("deposit_id"),
-            type=txn["type"],
-            amount=txn["amount"],
-            balance_after=txn["balance_after"],
-            timestamp=txn["timestamp"],
-            description=txn["description"]
-        ))
+    after = decode_cursor(cursor, datetime, ObjectId) if cursor else None
+    
+    await audit_log.record("read_transactions", user_id, current_user["role"])
+    response.headers["Vary"] = "Accept"
+    cached = not_modified(request, response, user_scope(user_id))
+    if cached:
+        return cached
+    
+    page = await get_repositories().transactions.history(user_id, limit or 0, after)
+    if limit and len(page) == limit:
+        last = page[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last["timestamp"], last["_id"]])
     
-    return transactions
+    return encode_list(request, response, TransactionResponse, [_transaction_response(txn) for txn in page])
+
+
+@router.get("/statement", response_model=StatementResponse)
+async def get_statement(
+    start: datetime,
+    end: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get a ledger statement for the period (start, end].
+    Opening and closing balances are derived from the nearest balance snapshots.
+    """
+    transactions = get_repositories().transactions
+    user_id = str(current_user["_id"])
+    start = naive_utc(start)
+    end = naive_utc(end) or utcnow()
+
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Statement end must not be before its start"
+        )
+    await audit_log.record("read_statement", user_id, current_user["role"], start=start, end=end)
+
+    entries = await transactions.entries(user_id, start, end)
+
+    return StatementResponse(
+        start=start,
+        end=end,
+        opening_balance=await transactions.balance_at(user_id, start),
+        closing_balance=await transactions.balance_at(user_id, end),
+        transactions=[_transaction_response(txn) for txn in entries]
+    )
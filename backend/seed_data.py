@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic users, deposits and ledger transactions for scale testing
+"""
+import argparse
+import asyncio
+import calendar
+import os
+import random
+import time
+from datetime import datetime, timedelta
+import certifi
+from argon2 import PasswordHasher
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from utils.interest import calculate_accrued_interest, calculate_maturity_date
+
+# Load environment variables
+load_dotenv()
+
+MATURITY_DAYS = 90
+INTEREST_RATE = 0.04
+SNAPSHOT_INTERVAL = int(os.getenv("LEDGER_SNAPSHOT_INTERVAL", "50"))
+
+# Status of the user's current deposit (None: no open deposit)
+CURRENT_STATUS_WEIGHTS = {"approved": 0.5, "pending": 0.15, None: 0.35}
+
+
+def object_id(rng: random.Random, when: datetime) -> ObjectId:
+    """Deterministic ObjectId that still sorts by creation time (`when` is naive UTC)."""
+    return ObjectId(calendar.timegm(when.utctimetuple()).to_bytes(4, "big") + rng.randbytes(8))
+
+
+class UserLedger:
+    """Builds one user's transactions with sequence numbers and snapshots."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.seq = 0
+        self.balance = 0.0
+        self.transactions = []
+        self.snapshots = []
+
+    def append(self, rng, entry_type, amount, description, deposit_id, timestamp):
+        self.seq += 1
+        self.balance += amount if entry_type != "withdrawal" else -amount
+        self.transactions.append({
+            "_id": object_id(rng, timestamp),
+            "user_id": self.user_id,
+            "seq": self.seq,
+            "deposit_id": deposit_id,
+            "type": entry_type,
+            "amount": amount,
+            "balance_after": round(self.balance, 2),
+            "timestamp": timestamp,
+            "description": description,
+        })
+        if SNAPSHOT_INTERVAL > 0 and self.seq % SNAPSHOT_INTERVAL == 0:
+            self.snapshots.append({
+                "user_id": self.user_id,
+                "seq": self.seq,
+                "balance": round(self.balance, 2),
+                "timestamp": timestamp,
+            })
+
+    def withdraw(self, rng, deposit, cycle_start, at, full):
+        interest = calculate_accrued_interest(deposit["amount"], INTEREST_RATE, cycle_start, as_of=at)
+        if interest > 0:
+            self.append(rng, "interest_accrual", interest, f"Interest accrued: ${interest:.2f}", str(deposit["_id"]), at)
+        if full:
+            amount = deposit["amount"] + interest
+            description = f"Full withdrawal: Principal ${deposit['amount']:.2f} + Interest ${interest:.2f}"
+        else:
+            amount = interest
+            description = f"Interest withdrawal: ${interest:.2f}"
+        self.append(rng, "withdrawal", amount, description, str(deposit["_id"]), at)
+
+
+def generate_deposit(rng, ledger, user_id, submitted_at, status, as_of, admin_id):
+    """Create a deposit and replay its lifecycle into the ledger."""
+    amount = float(rng.choice([500, 1000, 2500, 5000, 10000, 25000]) + rng.randrange(0, 100) * 10)
+    deposit = {
+        "_id": object_id(rng, submitted_at),
+        "user_id": user_id,
+        "amount": amount,
+        "proof_url": f"https://example.com/proofs/{rng.randbytes(8).hex()}.pdf",
+        "status": status,
+        "submitted_at": submitted_at,
+        "approved_at": None,
+        "approved_by": None,
+        "maturity_date": None,
+        "interest_rate": INTEREST_RATE,
+        "current_balance": 0.0,
+    }
+    if status == "pending":
+        # Pending requests are recent; admins work the queue within days
+        deposit["submitted_at"] = max(submitted_at, as_of - timedelta(days=rng.uniform(0, 7)))
+        return deposit
+    deposit["approved_by"] = admin_id
+    if status == "rejected":
+        return deposit
+
+    approved_at = submitted_at + timedelta(hours=rng.uniform(1, 72))
+    ledger.append(rng, "deposit", amount, f"Deposit approved - Principal: ${amount}", str(deposit["_id"]), approved_at)
+
+    # Roll over interest at (or some days after) each maturity while time allows
+    cycle_start = approved_at
+    closed = False
+    while not closed:
+        withdraw_at = calculate_maturity_date(cycle_start, MATURITY_DAYS) + timedelta(days=rng.expovariate(1 / 5))
+        if withdraw_at >= as_of:
+            break
+        closed = status == "withdrawn" and rng.random() < 0.5
+        ledger.withdraw(rng, deposit, cycle_start, withdraw_at, full=closed)
+        if not closed:
+            cycle_start = withdraw_at
+
+    if status == "withdrawn" and not closed:
+        # Not enough history to have cashed out yet; it is still open
+        deposit["status"] = "approved"
+
+    deposit["current_balance"] = amount
+    deposit["approved_at"] = cycle_start
+    deposit["maturity_date"] = calculate_maturity_date(cycle_start, MATURITY_DAYS)
+    return deposit
+
+
+def generate_block(seed, block, start, count, as_of, history_days, password_hashes, admin_id):
+    """Generate all documents for users [start, start + count). Deterministic per block."""
+    rng = random.Random(f"{seed}:{block}")
+    docs = {"users": [], "deposits": [], "transactions": [], "ledger_heads": [], "balance_snapshots": []}
+
+    for index in range(start, start + count):
+        created_at = as_of - timedelta(days=rng.uniform(0, history_days))
+        user_oid = object_id(rng, created_at)
+        user_id = str(user_oid)
+        docs["users"].append({
+            "_id": user_oid,
+            "username": f"user{index:07d}",
+            "email": f"user{index:07d}@example.com",
+            "username_lower": f"user{index:07d}",
+            "email_lower": f"user{index:07d}@example.com",
+            "password_hash": rng.choice(password_hashes),
+            "role": "user",
+            "created_at": created_at,
+            "is_active": rng.random() > 0.02,
+        })
+
+        # Closed deposits first, then at most one open deposit
+        ledger = UserLedger(user_id)
+        submitted_at = created_at + timedelta(days=rng.uniform(0, 10))
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            if submitted_at >= as_of:
+                break
+            status = "rejected" if rng.random() < 0.2 else "withdrawn"
+            deposit = generate_deposit(rng, ledger, user_id, submitted_at, status, as_of, admin_id)
+            docs["deposits"].append(deposit)
+            if deposit["status"] == "approved":
+                break  # Became the open deposit
+            last = ledger.transactions[-1]["timestamp"] if ledger.transactions else submitted_at
+            submitted_at = last + timedelta(days=rng.uniform(1, 30))
+        else:
+            status = rng.choices(list(CURRENT_STATUS_WEIGHTS), weights=CURRENT_STATUS_WEIGHTS.values())[0]
+            if status and submitted_at < as_of:
+                docs["deposits"].append(generate_deposit(rng, ledger, user_id, submitted_at, status, as_of, admin_id))
+
+        docs["transactions"].extend(ledger.transactions)
+        docs["balance_snapshots"].extend(ledger.snapshots)
+        if ledger.seq:
+            docs["ledger_heads"].append({"_id": user_id, "seq": ledger.seq, "balance": ledger.balance})
+
+    return docs
+
+
+async def insert_block(db, docs, stats):
+    for collection, batch in docs.items():
+        if batch:
+            await db[collection].insert_many(batch, ordered=False)
+            stats[collection] = stats.get(collection, 0) + len(batch)
+
+
+async def seed(args):
+    mongodb_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    database_name = os.getenv("DATABASE_NAME", "funds_management")
+    client = AsyncIOMotorClient(mongodb_uri, tlsCAFile=certifi.where())
+    db = client[database_name]
+
+    if args.drop:
+        await db.users.delete_many({"role": "user"})
+        for collection in ("deposits", "transactions", "transactions_archive", "ledger_heads", "balance_snapshots", "accounts"):
+            await db[collection].drop()
+        print("✓ Dropped existing user data")
+
+    admin = await db.users.find_one({"role": "admin"})
+    admin_id = str(admin["_id"]) if admin else None
+
+    # Argon2 is deliberately slow; hash a small pool once and reuse it
+    ph = PasswordHasher()
+    password_hashes = [ph.hash(args.password) for _ in range(8)]
+
+    as_of = args.as_of or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    stats = {}
+    pending = set()
+    started = time.perf_counter()
+
+    for block, start in enumerate(range(0, args.users, args.batch_size)):
+        docs = generate_block(
+            args.seed, block, start, min(args.batch_size, args.users - start),
+            as_of, args.history_days, password_hashes, admin_id
+        )
+        # At most `concurrency` blocks are being written (and held in memory) at once
+        if len(pending) >= args.concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.create_task(insert_block(db, docs, stats)))
+        print(f"  generated {start + len(docs['users'])}/{args.users} users", end="\r")
+
+    for task in asyncio.as_completed(pending):
+        await task
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Seeded in {elapsed:.1f}s (seed {args.seed}, as of {as_of:%Y-%m-%d}):")
+    for collection, count in stats.items():
+        print(f"   {collection}: {count}")
+    print(f"   Password for every user: {args.password}")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1000, help="users per insert_many batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="batches written in parallel")
+    parser.add_argument("--history-days", type=int, default=540, help="spread of user creation dates")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=None,
+                        help="reference 'now' for generated dates (default: today 00:00 UTC)")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--drop", action="store_true", help="delete existing users (except admins) and their data first")
+    asyncio.run(seed(parser.parse_args()))
@@ -0,0 +1,92 @@
+import itertools
+import os
+
+# Must be set before the app (and its settings) are imported
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["EVENT_SOURCE"] = "local"
+os.environ["INVALIDATION_SOURCE"] = "local"
+os.environ["CLOCK"] = "system"
+
+import pytest
+from argon2 import PasswordHasher
+from fastapi.testclient import TestClient
+from config import settings
+from main import app
+from utils import auth
+from utils.invalidation import reset_all
+from utils.clock import SimulatedClock, get_clock, set_clock
+
+BACKENDS = ["memory", "sqlite"]
+
+# Cheap hashing: production parameters cost a noticeable fraction of a second
+# per user created or logged in
+auth.ph = PasswordHasher(time_cost=1, memory_cost=1024, parallelism=1)
+
+_names = itertools.count()
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path, monkeypatch) -> str:
+    """Run the test once per embedded storage backend, on fresh storage."""
+    monkeypatch.setattr(settings, "database_backend", request.param)
+    monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "funds.db"))
+    monkeypatch.setattr(settings, "proof_storage_dir", str(tmp_path / "proofs"))
+    return request.param
+
+
+@pytest.fixture
+def client(backend):
+    reset_all()  # Start every in-process cache empty, as in a new process
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def clock():
+    """A frozen simulated clock, advanced explicitly by the test."""
+    original = get_clock()
+    simulated = SimulatedClock(rate=0)
+    set_clock(simulated)
+    yield simulated
+    set_clock(original)
+
+
+def login(client: TestClient, username: str, password: str) -> dict:
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin(client) -> dict:
+    """Headers authenticating as the default admin."""
+    return login(client, settings.default_admin_username, settings.default_admin_password)
+
+
+@pytest.fixture
+def make_user(client, admin):
+    """Create a user through the admin API and return (user id, headers)."""
+    def make_user() -> tuple[str, dict]:
+        username = f"user{next(_names)}"
+        response = client.post(
+            "/admin/users",
+            json={"username": username, "email": f"{username}@example.com", "password": "secret"},
+            headers=admin
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"], login(client, username, "secret")
+    return make_user
+
+
+@pytest.fixture
+def approved_deposit(client, admin):
+    """Submit a deposit for a user and approve it; returns the deposit id."""
+    def approved_deposit(headers: dict, amount: float = 1000.0) -> str:
+        response = client.post("/user/deposit", json={"amount": amount, "proof_url": "proof.pdf"}, headers=headers)
+        assert response.status_code == 200, response.text
+        deposit_id = response.json()["id"]
+        response = client.post(f"/admin/deposits/{deposit_id}/approve", headers=admin)
+        assert response.status_code == 200, response.text
+        return deposit_id
+    return approved_deposit
@@ -0,0 +1,27 @@
+from bson import ObjectId
+from repositories import get_repositories
+from utils.invalidation import invalidate
+
+
+def deactivate(backend: str, user_id: str):
+    # There is no API for it; change storage and evict the cached principal
+    # as the invalidation relay does when the user document changes
+    users = get_repositories().users
+    if backend == "sqlite":
+        users.conn.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+    else:
+        users._users[ObjectId(user_id)]["is_active"] = False
+    invalidate(f"principal:{user_id}")
+
+
+def test_deactivated_user_cannot_read_or_revalidate_account(client, backend, make_user, approved_deposit):
+    user_id, user = make_user()
+    approved_deposit(user)
+    response = client.get("/user/account", headers=user)
+    assert response.status_code == 200
+    assert response.json()["profile"]["is_active"] is True
+
+    deactivate(backend, user_id)
+    assert client.get("/user/account", headers=user).status_code == 403
+    response = client.get("/user/account", headers={**user, "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 403
@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from repositories.mongo import MongoAuditLog
+from utils import audit, metrics
+from utils.audit import AuditLogger, audit_log
+
+
+@pytest.fixture
+def recorded(monkeypatch) -> list[str]:
+    """The actions passed to the audit log, in order."""
+    actions = []
+    record = audit_log.record
+
+    async def capture(action: str, *args, **kwargs):
+        actions.append(action)
+        await record(action, *args, **kwargs)
+
+    monkeypatch.setattr(audit_log, "record", capture)
+    return actions
+
+
+class TimesOutAfterWriting(MongoAuditLog):
+    """Stores the first batch, then fails as if the reply was lost."""
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.calls = 0
+
+    async def insert_many(self, events: list[dict]) -> list[dict]:
+        self.calls += 1
+        failed = await super().insert_many(events)
+        if self.calls == 1:
+            raise TimeoutError("no reply")
+        return failed
+
+
+def test_retry_counts_events_stored_by_a_failed_attempt_as_written(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["audit_test"]
+    log = TimesOutAfterWriting(db)
+    monkeypatch.setattr(audit, "get_repositories", lambda: SimpleNamespace(audit=log))
+    written = metrics.value("audit_events_written_total")
+    dropped = metrics.value("audit_events_dropped_total", reason="write_failed", action="retry_test")
+
+    batch = [{"action": "retry_test", "n": n} for n in range(3)]
+    logger = AuditLogger(queue_size=10, batch_size=10, flush_seconds=1.0, block_seconds=0.1)
+    asyncio.run(logger._write(batch))
+
+    assert log.calls == 2
+    assert asyncio.run(db.audit_log.count_documents({})) == 3
+    assert metrics.value("audit_events_written_total") == written + 3
+    assert metrics.value("audit_events_dropped_total", reason="write_failed", action="retry_test") == dropped
+
+
+def test_revalidations_are_audited(client, recorded, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user)
+
+    for path, action in [("/user/balance", "read_balance"), ("/user/account", "read_account")]:
+        etag = client.get(path, headers=user).headers["ETag"]
+        assert client.get(path, headers={**user, "If-None-Match": etag}).status_code == 304
+        assert recorded.count(action) == 2
+
+
+def test_rejected_statement_is_not_audited(client, recorded, make_user):
+    _, user = make_user()
+
+    response = client.get("/user/statement", params={"start": "2024-02-01T00:00:00", "end": "2024-01-01T00:00:00"}, headers=user)
+    assert response.status_code == 400
+    assert "read_statement" not in recorded
+
+
+def test_pending_feed_is_audited_when_accepted(client, recorded, admin):
+    token = admin["Authorization"].removeprefix("Bearer ")
+    with client.websocket_connect(f"/admin/deposits/pending/feed?token={token}") as feed:
+        assert feed.receive_json()["type"] == "snapshot"
+    assert recorded.count("stream_pending_deposits") == 1
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from repositories import get_repositories
+
+
+@pytest.fixture
+def deposits(client, admin, make_user, approved_deposit) -> dict[str, str]:
+    """One approved, one pending and one rejected deposit, by status."""
+    approved = approved_deposit(make_user()[1], 100.0)
+
+    _, user = make_user()
+    pending = client.post("/user/deposit", json={"amount": 500.0, "proof_url": "proof.pdf"}, headers=user).json()["id"]
+
+    _, user = make_user()
+    rejected = client.post("/user/deposit", json={"amount": 1000.0, "proof_url": "proof.pdf"}, headers=user).json()["id"]
+    assert client.post(f"/admin/deposits/{rejected}/reject", headers=admin).status_code == 200
+
+    return {"approved": approved, "pending": pending, "rejected": rejected}
+
+
+def search(client, admin, **params) -> list[dict]:
+    response = client.get("/admin/deposits", params=params, headers=admin)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_status_filter(client, admin, deposits):
+    assert [d["id"] for d in search(client, admin, status="pending")] == [deposits["pending"]]
+    found = search(client, admin, status=["approved", "rejected"])
+    assert {d["id"] for d in found} == {deposits["approved"], deposits["rejected"]}
+
+
+def test_user_filter(client, admin, deposits):
+    deposit = search(client, admin, status="pending")[0]
+    assert [d["id"] for d in search(client, admin, user_id=deposit["user_id"])] == [deposits["pending"]]
+
+
+def test_amount_range(client, admin, deposits):
+    found = search(client, admin, min_amount=100.0, max_amount=500.0)
+    assert {d["id"] for d in found} == {deposits["approved"], deposits["pending"]}
+
+
+@pytest.mark.parametrize("params, statuses", [
+    ({"submitted_from": "2000-01-01T00:00:00Z"}, {"approved", "pending", "rejected"}),
+    ({"submitted_from": "2099-01-01T00:00:00+05:00"}, set()),
+    ({"submitted_to": "2000-01-01T00:00:00"}, set()),
+    ({"approved_from": "2000-01-01T00:00:00Z", "approved_to": "2099-01-01T00:00:00-03:00"}, {"approved"}),
+])
+def test_time_ranges(client, admin, deposits, params, statuses):
+    assert {d["status"] for d in search(client, admin, **params)} == statuses
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_sort_by_amount(client, admin, deposits, order):
+    amounts = [d["amount"] for d in search(client, admin, sort="amount", order=order)]
+    assert amounts == sorted(amounts, reverse=order == "desc")
+
+
+def test_writes_return_deposits_as_reads_do(client, make_user):
+    user_id, _ = make_user()
+    deposits = get_repositories().deposits
+    aware = datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone(timedelta(hours=2)))
+    created = client.portal.call(deposits.create, {
+        "user_id": user_id, "amount": 100.0, "proof_url": "proof.pdf", "status": "pending",
+        "submitted_at": aware, "approved_at": None, "approved_by": None, "maturity_date": None,
+        "interest_rate": 0.04, "current_balance": 100.0,
+    })
+    assert created == client.portal.call(deposits.get, str(created["_id"]))
+
+    updated = client.portal.call(deposits.update, created, {"status": "approved", "approved_at": aware})
+    assert updated == client.portal.call(deposits.get, str(created["_id"]))
+    assert updated["approved_at"] == datetime(2024, 1, 1, 10, 0, 0, 123000)
+
+
+@pytest.mark.parametrize("sort", ["submitted_at", "approved_at", "amount"])
+def test_sqlite_status_searches_use_an_index(client, backend, sort):
+    if backend != "sqlite":
+        pytest.skip("query plans are SQLite's")
+    deposits = get_repositories().deposits
+    statements = []
+    deposits.conn.set_trace_callback(statements.append)
+    try:
+        client.portal.call(lambda: deposits.search(statuses=["approved"], sort=sort, limit=10))
+    finally:
+        deposits.conn.set_trace_callback(None)
+
+    plan = " ".join(row[-1] for row in deposits.conn.execute(f"EXPLAIN QUERY PLAN {statements[-1]}"))
+    assert f"INDEX deposits_status_{sort.removesuffix('_at')}" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,62 @@
+import os
+from datetime import timedelta
+from utils import invalidation, versioning
+
+
+def test_conditional_get_until_a_write(client, admin, make_user):
+    response = client.get("/admin/users", headers=admin)
+    etag = response.headers["ETag"]
+    assert client.get("/admin/users", headers={**admin, "If-None-Match": etag}).status_code == 304
+
+    make_user()
+    response = client.get("/admin/users", headers={**admin, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_bumps_apply_the_same_version_in_every_worker(client, admin):
+    etag = client.get("/admin/users", headers=admin).headers["ETag"]
+
+    # What another worker's relay applies for a bump made elsewhere
+    token = os.urandom(4).hex()
+    invalidation._apply([f"version:users@{token}"])
+    shared = client.get("/admin/users", headers=admin).headers["ETag"]
+    assert shared != etag
+    assert versioning._versions["users"] == token
+    assert shared.endswith(f'-{token}"')
+
+
+def test_missed_invalidations_never_match_old_etags(client, admin):
+    etag = client.get("/admin/users", headers=admin).headers["ETag"]
+
+    invalidation.reset_all()  # As when the relay reconnects
+    response = client.get("/admin/users", headers={**admin, "If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_expiring_etags_carry_their_expiry(client, clock, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user)
+    etag = client.get("/user/account", headers=user).headers["ETag"]
+    assert versioning.EXPIRY_SEPARATOR in etag
+
+    # Honoured from the tag alone, as by a worker that never served it
+    clock.advance(timedelta(hours=23))
+    response = client.get("/user/account", headers={**user, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    clock.advance(timedelta(hours=1))
+    response = client.get("/user/account", headers={**user, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_unexpired_etag_is_not_honoured_after_a_write(client, make_user, approved_deposit):
+    user_id, user = make_user()
+    approved_deposit(user)
+    etag = client.get("/user/account", headers=user).headers["ETag"]
+
+    versioning.bump(versioning.user_scope(user_id))
+    response = client.get("/user/account", headers={**user, "If-None-Match": etag})
+    assert response.status_code == 200
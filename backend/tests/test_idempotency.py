@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+DEPOSIT = {"amount": 1000.0, "proof_url": "proof.pdf"}
+
+
+def user_deposits(client, admin, headers) -> list[dict]:
+    user_id = client.get("/user/account", headers=headers).json()["profile"]["id"]
+    return client.get("/admin/deposits", params={"user_id": user_id}, headers=admin).json()
+
+
+def test_retry_replays_the_first_response(client, admin, make_user):
+    _, user = make_user()
+    headers = {**user, "Idempotency-Key": "deposit-1"}
+
+    first = client.post("/user/deposit", json=DEPOSIT, headers=headers)
+    retry = client.post("/user/deposit", json=DEPOSIT, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(user_deposits(client, admin, user)) == 1
+
+
+def test_without_key_requests_run_every_time(client, make_user):
+    _, user = make_user()
+
+    assert client.post("/user/deposit", json=DEPOSIT, headers=user).status_code == 200
+    assert client.post("/user/deposit", json=DEPOSIT, headers=user).status_code == 400  # Already active
+
+
+def test_reusing_a_key_with_another_body_is_rejected(client, make_user):
+    _, user = make_user()
+    headers = {**user, "Idempotency-Key": "deposit-1"}
+
+    assert client.post("/user/deposit", json=DEPOSIT, headers=headers).status_code == 200
+    response = client.post("/user/deposit", json={**DEPOSIT, "amount": 2000.0}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_client_errors_are_replayed(client, clock, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user)
+    headers = {**user, "Idempotency-Key": "withdraw-1"}
+
+    first = client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers=headers)
+    assert first.status_code == 400
+    clock.advance(timedelta(days=91))
+    retry = client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers=headers)
+    assert (retry.status_code, retry.json()) == (400, first.json())
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # A new key is a new attempt
+    response = client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers={**user, "Idempotency-Key": "withdraw-2"})
+    assert response.status_code == 200, response.text
+
+
+def test_keys_are_scoped_per_user(client, admin, make_user):
+    _, first = make_user()
+    _, second = make_user()
+
+    for user in (first, second):
+        response = client.post("/user/deposit", json=DEPOSIT, headers={**user, "Idempotency-Key": "same-key"})
+        assert response.status_code == 200
+        assert "Idempotent-Replayed" not in response.headers
+        assert len(user_deposits(client, admin, user)) == 1
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import timedelta
+import httpx
+from repositories import get_repositories
+from utils.ledger import signed_amount
+
+
+def post_concurrently(client, monkeypatch, read: str, *requests: tuple[str, dict, dict]) -> list[int]:
+    """
+    Send POSTs at once, each pausing after it reads the deposit (through
+    the repository method `read`), so all read it before any writes.
+
+    Returns:
+        The response status codes, sorted
+    """
+    deposits = get_repositories().deposits
+    original = getattr(deposits, read)
+
+    async def read_then_pause(*args):
+        deposit = await original(*args)
+        await asyncio.sleep(0.05)
+        return deposit
+
+    monkeypatch.setattr(deposits, read, read_then_pause)
+
+    async def send():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http:
+            return await asyncio.gather(*(http.post(url, json=body, headers=headers) for url, body, headers in requests))
+
+    return sorted(response.status_code for response in client.portal.call(send))
+
+
+def test_approval_credits_ledger_and_balance(client, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user, 1000.0)
+
+    balance = client.get("/user/balance", headers=user).json()
+    assert balance == {
+        "principal": 1000.0,
+        "accrued_interest": 0.0,
+        "total_balance": 1000.0,
+        "has_active_deposit": True,
+    }
+    transactions = client.get("/user/transactions", headers=user).json()
+    assert [(t["seq"], t["type"], t["amount"], t["balance_after"]) for t in transactions] == [
+        (1, "deposit", 1000.0, 1000.0)
+    ]
+
+
+def test_concurrent_approvals_credit_once(client, monkeypatch, admin, make_user):
+    _, user = make_user()
+    deposit_id = client.post("/user/deposit", json={"amount": 1000.0, "proof_url": "proof.pdf"}, headers=user).json()["id"]
+
+    approve = (f"/admin/deposits/{deposit_id}/approve", None, admin)
+    assert post_concurrently(client, monkeypatch, "get", approve, approve) == [200, 409]
+    transactions = client.get("/user/transactions", headers=user).json()
+    assert [(t["type"], t["amount"]) for t in transactions] == [("deposit", 1000.0)]
+
+
+def test_concurrent_withdrawals_pay_once(client, monkeypatch, clock, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user, 1000.0)
+    clock.advance(timedelta(days=91))
+
+    withdraw = ("/user/withdraw", {"withdraw_type": "full"}, user)
+    assert post_concurrently(client, monkeypatch, "find_active", withdraw, withdraw) == [200, 409]
+    transactions = client.get("/user/transactions", headers=user).json()
+    assert [t["type"] for t in transactions].count("withdrawal") == 1
+    assert transactions[0]["balance_after"] == 0.0
+
+
+def test_withdrawals_append_in_sequence(client, clock, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user, 1000.0)
+
+    clock.advance(timedelta(days=91))
+    response = client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers=user)
+    assert response.status_code == 200, response.text
+    assert response.json()["amount"] > 0
+    assert client.get("/user/balance", headers=user).json()["accrued_interest"] == 0.0
+
+    clock.advance(timedelta(days=91))
+    response = client.post("/user/withdraw", json={"withdraw_type": "full"}, headers=user)
+    assert response.status_code == 200, response.text
+    assert client.get("/user/balance", headers=user).json()["has_active_deposit"] is False
+
+    entries = client.get("/user/transactions", headers=user).json()[::-1]
+    assert [e["seq"] for e in entries] == list(range(1, len(entries) + 1))
+    balance = 0.0
+    for entry in entries:
+        balance = round(balance + signed_amount(entry["type"], entry["amount"]), 2)
+        assert entry["balance_after"] == balance
+    assert balance == 0.0
+
+
+def test_withdrawal_before_maturity_is_refused(client, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user)
+
+    response = client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers=user)
+    assert response.status_code == 400
+    assert len(client.get("/user/transactions", headers=user).json()) == 1
+
+
+def test_statement_balances(client, clock, make_user, approved_deposit):
+    _, user = make_user()
+    approved_deposit(user, 1000.0)
+    clock.advance(timedelta(days=91))
+    client.post("/user/withdraw", json={"withdraw_type": "interest"}, headers=user)
+
+    # Timezone-aware bounds are accepted and compared as UTC
+    response = client.get("/user/statement", params={"start": "2000-01-01T00:00:00Z"}, headers=user)
+    assert response.status_code == 200, response.text
+    statement = response.json()
+    assert statement["opening_balance"] == 0.0
+    assert statement["closing_balance"] == 1000.0
+    assert [t["seq"] for t in statement["transactions"]] == [1, 2, 3]
+
+    response = client.get(
+        "/user/statement",
+        params={"start": "2099-01-01T00:00:00Z", "end": "2000-01-01T00:00:00+02:00"},
+        headers=user
+    )
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+import base64
+import pytest
+from repositories import get_repositories
+
+
+def collect_pages(client, path: str, headers: dict, **params) -> list:
+    """Follow X-Next-Cursor from the first page to the last."""
+    items = []
+    cursor = None
+    while True:
+        page_params = {**params, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=page_params, headers=headers)
+        assert response.status_code == 200, response.text
+        items += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+
+def test_transaction_pages_match_full_history(client, make_user):
+    user_id, user = make_user()
+    transactions = get_repositories().transactions
+    for i in range(5):
+        client.portal.call(transactions.append, user_id, "deposit", 100.0 + i, f"Deposit {i}")
+
+    history = client.get("/user/transactions", headers=user).json()
+    assert len(history) == 5
+    assert collect_pages(client, "/user/transactions", user) == history
+
+
+def test_dashboard_cursor_continues_into_transactions(client, make_user):
+    user_id, user = make_user()
+    transactions = get_repositories().transactions
+    for i in range(5):
+        client.portal.call(transactions.append, user_id, "deposit", 100.0 + i, f"Deposit {i}")
+
+    response = client.get("/user/dashboard", params={"limit": 3}, headers=user)
+    recent = response.json()["recent_transactions"]
+    rest = client.get(
+        "/user/transactions",
+        params={"cursor": response.headers["X-Next-Cursor"]},
+        headers=user
+    ).json()
+    assert recent + rest == client.get("/user/transactions", headers=user).json()
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_user_pages_match_full_list(client, admin, make_user, order):
+    for _ in range(4):
+        make_user()
+
+    users = client.get("/admin/users", params={"order": order}, headers=admin).json()
+    assert len(users) == 4
+    assert collect_pages(client, "/admin/users", admin, order=order) == users
+
+
+def test_substring_user_search_requires_a_limit(client, admin, make_user):
+    for _ in range(3):
+        make_user()
+
+    params = {"q": "SER", "match": "substring"}
+    assert client.get("/admin/users", params=params, headers=admin).status_code == 400
+    assert len(client.get("/admin/users", params={**params, "limit": 10}, headers=admin).json()) == 3
+    assert client.get("/admin/users", params={"q": "SER"}, headers=admin).json() == []
+
+
+@pytest.mark.parametrize("sort", ["submitted_at", "approved_at", "amount"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_deposit_pages_match_full_list(client, admin, make_user, approved_deposit, sort, order):
+    for amount in (300.0, 100.0, 500.0, 100.0, 200.0):
+        approved_deposit(make_user()[1], amount)
+
+    deposits = client.get("/admin/deposits", params={"sort": sort, "order": order}, headers=admin).json()
+    assert len(deposits) == 5
+    assert collect_pages(client, "/admin/deposits", admin, sort=sort, order=order) == deposits
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"[]").decode(),
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b"[1]").decode(),
+    base64.urlsafe_b64encode(b'["a", "b"]').decode(),
+])
+@pytest.mark.parametrize("path", ["/admin/users", "/admin/deposits", "/user/transactions"])
+def test_malformed_cursor_is_rejected(client, admin, make_user, path, cursor):
+    headers = admin if path.startswith("/admin") else make_user()[1]
+
+    response = client.get(path, params={"limit": 2, "cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,26 @@
+import asyncio
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from utils import metrics, rate_limit
+from utils.rate_limit import MongoRateLimitStore
+
+
+def test_unreachable_mongo_falls_back_to_memory_limits(monkeypatch):
+    # Nothing listens there: server selection would wait its full 30s
+    client = AsyncIOMotorClient("mongodb://127.0.0.1:1", serverSelectionTimeoutMS=30_000)
+    monkeypatch.setattr(rate_limit, "get_database", lambda: client.funds_test)
+    store = MongoRateLimitStore(timeout=0.1)
+    failed = metrics.value("rate_limit_fallbacks_total", error="ServerSelectionTimeoutError")
+    skipped = metrics.value("rate_limit_fallbacks_total", error="recent_failure")
+
+    async def take_burst() -> list[float]:
+        return [await store.take("user:1|*", 0.01, 2) for _ in range(3)]
+
+    started = time.monotonic()
+    waits = asyncio.run(take_burst())
+    client.close()
+
+    assert time.monotonic() - started < 2  # Not the 30s server selection wait
+    assert waits[:2] == [0.0, 0.0] and waits[2] > 0  # Still limited, per worker
+    assert metrics.value("rate_limit_fallbacks_total", error="ServerSelectionTimeoutError") == failed + 1
+    assert metrics.value("rate_limit_fallbacks_total", error="recent_failure") == skipped + 2
@@ -0,0 +1,17 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from utils.projection import day_grid
+from utils.simulation import Scenario, run_simulation
+
+
+def test_simulation_starts_at_the_app_clock(clock):
+    mongomock = pytest.importorskip("mongomock")
+    deposits = mongomock.MongoClient().db.deposits
+    deposits.insert_one({"status": "approved", "amount": 1000.0, "approved_at": clock.now()})
+    clock.advance(timedelta(days=45))
+
+    scenarios, grid = [Scenario(0.04, 90)], day_grid(90, 30)
+    count, totals = run_simulation(deposits, scenarios, grid)
+    assert count == 1
+    np.testing.assert_array_equal(totals, run_simulation(deposits, scenarios, grid, now=clock.now())[1])
@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+import repositories
+from config import settings
+from main import app
+from utils import metrics
+from utils.invalidation import reset_all
+
+
+@pytest.fixture(params=["mongo", "sqlite", "memory"])
+def any_backend(request, tmp_path, monkeypatch) -> str:
+    """Every storage backend, with MongoDB mocked in process."""
+    if request.param == "mongo":
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        import database
+
+        async def connect_to_mongo():
+            database.database = mongomock_motor.AsyncMongoMockClient()[settings.database_name]
+
+        monkeypatch.setattr(repositories, "connect_to_mongo", connect_to_mongo)
+        monkeypatch.setattr(database, "database", None)
+    monkeypatch.setattr(settings, "database_backend", request.param)
+    monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "funds.db"))
+    monkeypatch.setattr(settings, "proof_storage_dir", str(tmp_path / "proofs"))
+    return request.param
+
+
+def test_app_starts_and_flushes_the_audit_log_on_shutdown(any_backend):
+    written = metrics.value("audit_events_written_total")
+    reset_all()
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+
+        # The default admin is created on startup
+        response = client.post("/auth/login", json={
+            "username": settings.default_admin_username,
+            "password": settings.default_admin_password,
+        })
+        assert response.status_code == 200, response.text
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        assert client.get("/admin/deposits/pending", headers=headers).status_code == 200
+
+    # Queued events are written on shutdown, not lost
+    assert metrics.value("audit_events_written_total") == written + 1
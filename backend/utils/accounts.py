@@ -0,0 +1,106 @@
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from utils.archive import find_across_tiers
+
+# One document per user (keyed by user id) holding the dashboard's deposit
+# and transactions, so they can be served by a single _id lookup:
+#   active_deposit      - summary of the pending/approved deposit, or None
+#   recent_transactions - the newest `account_recent_transactions` entries
+#   built               - set once the document was built from the sources
+# Write paths update it in place and $inc `rev`. A document that was never
+# built (or none at all) is rebuilt from the source collections on read.
+# The profile is not stored: it comes from the authenticated user, so role
+# and deactivation changes apply at once.
+
+DEPOSIT_FIELDS = (
+    "_id", "user_id", "amount", "proof_url", "status", "submitted_at",
+    "approved_at", "maturity_date", "interest_rate",
+)
+ACTIVE_STATUSES = ("pending", "approved")
+# Ledger entries are pushed in sequence order; entries written before the
+# ledger existed have no seq and sort after them, oldest last
+RECENT_SORT = {"seq": -1}
+HISTORY_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def _deposit_summary(deposit: Optional[dict]) -> Optional[dict]:
+    if not deposit or deposit.get("status") not in ACTIVE_STATUSES:
+        return None
+    return {field: deposit.get(field) for field in DEPOSIT_FIELDS}
+
+
+async def record_transaction(db, entry: dict):
+    """
+    Add a ledger entry to the user's recent transactions, keeping the newest N.
+    """
+    await db.accounts.update_one(
+        {"_id": entry["user_id"]},
+        {
+            "$push": {"recent_transactions": {
+                "$each": [entry],
+                "$sort": RECENT_SORT,
+                "$slice": settings.account_recent_transactions,
+            }},
+            "$inc": {"rev": 1},
+        },
+        upsert=True,
+    )
+
+
+async def record_deposit(db, deposit: dict):
+    """
+    Store the user's active deposit after it changed; closed deposits clear it.
+
+    Args:
+        db: The Motor database
+        deposit: The deposit document with the change applied
+    """
+    await db.accounts.update_one(
+        {"_id": deposit["user_id"]},
+        {"$set": {"active_deposit": _deposit_summary(deposit)}, "$inc": {"rev": 1}},
+        upsert=True,
+    )
+
+
+async def build_account(db, user_id: str, rev: Optional[int] = None) -> dict:
+    """
+    Rebuild a user's account document from the source collections.
+
+    The write is conditional on `rev` (the revision the caller saw, None if
+    there was no document), so a write path racing with the rebuild is never
+    overwritten; the result is still returned and the next read retries.
+    """
+    deposit = await db.deposits.find_one({"user_id": user_id, "status": {"$in": list(ACTIVE_STATUSES)}})
+    recent = await find_across_tiers(
+        db,
+        {"user_id": user_id},
+        HISTORY_SORT,
+        settings.account_recent_transactions,
+    )
+    account = {
+        "_id": user_id,
+        "rev": (rev or 0) + 1,
+        "built": True,
+        "active_deposit": _deposit_summary(deposit),
+        "recent_transactions": recent,
+    }
+    if rev is None:
+        try:
+            await db.accounts.insert_one(account)
+        except DuplicateKeyError:
+            pass
+    else:
+        await db.accounts.replace_one({"_id": user_id, "rev": rev}, account)
+    return account
+
+
+async def get_account(db, user_id: str) -> dict:
+    """
+    Get a user's account document with one indexed read, building it on
+    first use.
+    """
+    account = await db.accounts.find_one({"_id": user_id})
+    if account and account.get("built"):
+        return account
+    return await build_account(db, user_id, account["rev"] if account else None)
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta
+from pymongo.errors import BulkWriteError
+from config import settings
+from utils.clock import utcnow
+
+# Transaction tiers, newest first. Every entry lives in exactly one tier,
+# except briefly while being moved, when it may be found in both.
+HOT = "transactions"
+ARCHIVE = "transactions_archive"
+TIERS = (HOT, ARCHIVE)
+
+
+async def archive_transactions(db, older_than: datetime, batch_size: int = 1000) -> int:
+    """
+    Move transactions older than `older_than` from the hot tier to the archive.
+
+    Each batch is copied before it is deleted, so an interrupted run never
+    loses entries and can simply be re-run.
+
+    Args:
+        db: The Motor database
+        older_than: Entries with an earlier timestamp are archived
+        batch_size: Number of entries moved per round trip
+
+    Returns:
+        The number of entries moved
+    """
+    moved = 0
+    while True:
+        batch = await db[HOT].find(
+            {"timestamp": {"$lt": older_than}}
+        ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return moved
+
+        try:
+            await db[ARCHIVE].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Entries copied by a previous, interrupted run are fine
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+
+        await db[HOT].delete_many({"_id": {"$in": [txn["_id"] for txn in batch]}})
+        moved += len(batch)
+
+
+async def run_archiver(db):
+    """
+    Periodically archive transactions older than the configured horizon.
+    """
+    interval = settings.transaction_archive_interval_minutes * 60
+    while True:
+        cutoff = utcnow() - timedelta(days=settings.transaction_archive_after_days)
+        try:
+            moved = await archive_transactions(db, cutoff)
+            if moved:
+                print(f"Archived {moved} transactions older than {cutoff:%Y-%m-%d}")
+        except Exception as e:
+            print(f"Transaction archiving failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def find_across_tiers(db, query: dict, sort: list[tuple[str, int]], limit: int = 0) -> list[dict]:
+    """
+    Read transactions from the hot tier, falling back to the archive when the
+    hot tier cannot fill the requested page.
+
+    The hot tier is read first: an entry being moved is always inserted into
+    the archive before it is removed, so it is seen at least once, and
+    duplicates are dropped by `_id`. Archived entries are always older than
+    hot ones, so a newest-first page filled from the hot tier is complete.
+
+    Args:
+        db: The Motor database
+        query: MongoDB filter
+        sort: Sort specification shared by both tiers
+        limit: Maximum number of entries (0 for no limit)
+
+    Returns:
+        Matching entries in sort order
+    """
+    results = []
+    seen = set()
+    for tier in TIERS:
+        cursor = db[tier].find(query).sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        async for txn in cursor:
+            if txn["_id"] not in seen:
+                seen.add(txn["_id"])
+                results.append(txn)
+        if tier == HOT and limit and len(results) >= limit and sort[0][1] < 0:
+            return results
+
+    for field, direction in reversed(sort):
+        results.sort(key=lambda txn: txn[field], reverse=direction < 0)
+    return results[:limit] if limit else results
@@ -0,0 +1,170 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from config import settings
+from repositories import get_repositories
+from utils.metrics import describe, increment
+
+describe("audit_events_written_total", "Audit events written to the audit log")
+describe("audit_events_dropped_total", "Audit events lost because the queue was full or writes kept failing")
+describe("audit_events_delayed_total", "Admin actions that had to wait for audit queue space")
+
+WRITE_ATTEMPTS = 3
+
+
+class AuditLogger:
+    """
+    Write-behind audit log.
+
+    Requests only put events on a bounded queue; a background task writes
+    them in batches with one insert per `batch_size` events or per
+    `flush_seconds`, whichever comes first. When the queue is full, reads
+    are dropped at once and admin actions (`critical`) wait up to
+    `block_seconds` for space before being dropped, slowing the admin down
+    rather than the whole API. Every drop is counted in
+    `audit_events_dropped_total`. `close`, called on shutdown, writes out
+    everything buffered.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_seconds: float, block_seconds: float):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.block_seconds = block_seconds
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background writer (on the running event loop)."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Write out everything queued, then stop the writer."""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+            self._queue = None
+
+    async def record(
+        self,
+        action: str,
+        actor_id: str,
+        role: str,
+        target: Optional[str] = None,
+        critical: bool = False,
+        **details
+    ):
+        """
+        Queue an audit event.
+
+        Args:
+            action: What happened, e.g. "approve_deposit" or "read_balance"
+            actor_id: User who did it
+            role: The actor's role
+            target: Deposit or user acted on, if any
+            critical: Wait for queue space (admin actions) instead of dropping at once
+            details: Extra fields stored with the event
+        """
+        if not settings.audit_enabled:
+            return
+        if self._queue is None or self._stopping.is_set():
+            increment("audit_events_dropped_total", reason="stopped", action=action)
+            return
+        event = {
+            "at": datetime.utcnow(),  # Real time, even under a simulated clock
+            "action": action,
+            "actor_id": actor_id,
+            "role": role,
+            "target": target,
+            "details": details,
+        }
+        try:
+            self._queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            if not critical:
+                increment("audit_events_dropped_total", reason="queue_full", action=action)
+                return
+
+        increment("audit_events_delayed_total", action=action)
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.block_seconds)
+        except asyncio.TimeoutError:
+            increment("audit_events_dropped_total", reason="queue_full", action=action)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+            elif self._stopping.is_set():
+                return
+
+    async def _collect(self) -> list[dict]:
+        # Wait for a first event, then fill the batch until it is full or
+        # flush_seconds have passed since that event
+        batch = []
+        loop = asyncio.get_running_loop()
+        deadline = None
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            elif self._stopping.is_set():
+                break
+            else:
+                timeout = self.flush_seconds if deadline is None else deadline - loop.time()
+                if timeout <= 0:
+                    break
+                event = await self._next(timeout)
+                if event is None:
+                    if batch:
+                        break
+                    continue  # Idle, or closing; check for shutdown
+                batch.append(event)
+            if deadline is None:
+                deadline = loop.time() + self.flush_seconds
+        return batch
+
+    async def _next(self, timeout: float) -> Optional[dict]:
+        # The next queued event, or None after `timeout` or once close() is
+        # called, so shutdown doesn't wait out flush_seconds
+        get = asyncio.ensure_future(self._queue.get())
+        stopping = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait((get, stopping), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if get.done():
+            return get.result()
+        get.cancel()  # An event put meanwhile stays queued
+        return None
+
+    async def _write(self, batch: list[dict]):
+        # Retry only the events a failed attempt did not store
+        pending = batch
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                failed = await get_repositories().audit.insert_many(pending)
+            except Exception as e:
+                print(f"Audit log write of {len(pending)} events failed (attempt {attempt + 1}): {e}")
+            else:
+                if len(failed) < len(pending):
+                    increment("audit_events_written_total", amount=len(pending) - len(failed))
+                if not failed:
+                    return
+                print(f"Audit log write stored {len(pending) - len(failed)} of {len(pending)} events (attempt {attempt + 1})")
+                pending = failed
+            if attempt + 1 < WRITE_ATTEMPTS:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        for action, count in Counter(event["action"] for event in pending).items():
+            increment("audit_events_dropped_total", amount=count, reason="write_failed", action=action)
+
+audit_log = AuditLogger(
+    queue_size=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_seconds=settings.audit_flush_seconds,
+    block_seconds=settings.audit_block_seconds,
+)
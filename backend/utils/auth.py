@@ -1,3 +1,5 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -6,7 +8,8 @@ from argon2.exceptions import VerifyMismatchError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import settings
-from database import get_database
+from repositories import get_repositories
+from utils.invalidation import register
 from bson import ObjectId
 
 # Password hashing with Argon2
@@ -14,6 +17,31 @@ ph = PasswordHasher()
 
 # JWT token security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Scope of the tokens that open /user/events from a browser EventSource
+STREAM_SCOPE = "events"
+
+# Users resolved from tokens, by id, so most authenticated requests skip the
+# users lookup. Entries live for principal_cache_seconds and are evicted in
+# every worker when the user document changes (see utils.invalidation).
+_principals: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+_evictions = 0  # Bumped on every eviction so a lookup racing one isn't cached
+
+
+def _evict_principal(user_id: str):
+    global _evictions
+    _evictions += 1
+    _principals.pop(user_id, None)
+
+
+def _reset_principals():
+    global _evictions
+    _evictions += 1
+    _principals.clear()
+
+
+register("principal", _evict_principal, _reset_principals)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -55,20 +83,48 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get the current authenticated user from JWT token."""
-    token = credentials.credentials
+def get_token_subject(token: str, scope: Optional[str] = None) -> str:
+    """
+    Get the user id from a JWT without a database lookup.
+
+    Args:
+        token: The JWT
+        scope: Scope the token must carry; access tokens have none
+    """
     payload = decode_access_token(token)
     user_id: str = payload.get("sub")
-    if user_id is None:
+    if user_id is None or not ObjectId.is_valid(user_id) or payload.get("scope") != scope:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return user_id
+
+
+def create_stream_token(user_id: str) -> str:
+    """
+    Create a short-lived token that only opens the user's event stream.
+
+    Browsers' EventSource can't send an Authorization header, so it passes
+    this in the query string instead, where it may end up in access logs.
+    """
+    return create_access_token(
+        {"sub": user_id, "scope": STREAM_SCOPE},
+        timedelta(seconds=settings.sse_token_seconds)
+    )
+
+
+async def get_user_from_token(token: str, scope: Optional[str] = None) -> dict:
+    """Resolve a JWT access token (or a token with `scope`) to its user document."""
+    user_id = get_token_subject(token, scope)
     
-    db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    cached = _principals.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return dict(cached[1])
+    
+    evictions = _evictions
+    user = await get_repositories().users.get(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,9 +132,20 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if settings.principal_cache_seconds > 0 and evictions == _evictions:
+        _principals[user_id] = (time.monotonic() + settings.principal_cache_seconds, dict(user))
+        _principals.move_to_end(user_id)
+        if len(_principals) > settings.principal_cache_size:
+            _principals.popitem(last=False)
+    
     return user
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get the current authenticated user from JWT token."""
+    return await get_user_from_token(credentials.credentials)
+
+
 async def get_current_admin_user(current_user: dict = Depends(get_current_user)):
     """Verify that the current user is an admin."""
     if current_user.get("role") != "admin":
@@ -98,3 +165,23 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
         )
     return current_user
 
+
+async def get_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Get the active user opening an event stream, from an Authorization
+    header or a stream token in the `token` query parameter.
+    """
+    if credentials:
+        user = await get_user_from_token(credentials.credentials)
+    elif token:
+        user = await get_user_from_token(token, STREAM_SCOPE)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_active_user(user)
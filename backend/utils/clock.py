@@ -0,0 +1,96 @@
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from config import settings
+
+# The application's notion of "now" (naive UTC, like datetime.utcnow()).
+# Everything that stamps or ages business data — deposits, approvals,
+# ledger entries, interest and maturity — reads it through `utcnow()`, so a
+# simulated clock can fast-forward the whole system through maturity cycles.
+# Security and housekeeping timers (JWT expiry, idempotency and rate-limit
+# windows) stay on real time. The clock is per process: run simulations on
+# a single worker.
+
+
+class Clock(ABC):
+
+    @abstractmethod
+    def now(self) -> datetime:
+        ...
+
+
+class SystemClock(Clock):
+    """Real UTC time."""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+
+class SimulatedClock(Clock):
+    """
+    UTC time that starts at `start`, runs at `rate` times real time (0 to
+    freeze it) and can be moved forward with `advance`.
+    """
+
+    def __init__(self, start: Optional[datetime] = None, rate: float = 1.0):
+        self._origin = start or datetime.utcnow()
+        self._started = time.monotonic()
+        self.rate = rate
+
+    def now(self) -> datetime:
+        return self._origin + timedelta(seconds=(time.monotonic() - self._started) * self.rate)
+
+    def advance(self, delta: timedelta) -> datetime:
+        """
+        Move the clock forward.
+
+        Only forward: ledger order, cursors and cached ETags all assume time
+        never goes back.
+
+        Returns:
+            The new time
+        """
+        if delta < timedelta(0):
+            raise ValueError("The clock can only move forward")
+        self._origin += delta
+        return self.now()
+
+
+def _from_settings() -> Clock:
+    if settings.clock == "simulated":
+        return SimulatedClock(settings.clock_start, settings.clock_rate)
+    return SystemClock()
+
+
+_clock: Clock = _from_settings()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock):
+    """Replace the process clock, e.g. with a SimulatedClock in a benchmark."""
+    global _clock
+    _clock = clock
+
+
+def utcnow() -> datetime:
+    """Current time on the process clock."""
+    return _clock.now()
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a datetime to naive UTC, the form stored and compared everywhere.
+
+    Args:
+        value: Naive (taken as UTC already) or timezone-aware datetime, or None
+
+    Returns:
+        The same instant as naive UTC, or None
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
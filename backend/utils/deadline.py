@@ -0,0 +1,72 @@
+import json
+import pymongo
+from pymongo.errors import PyMongoError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from utils.metrics import describe, increment
+
+describe("db_timeouts_total", "Requests that failed because a database call exceeded its time budget")
+
+
+class DeadlineMiddleware:
+    """
+    Per-request time budget for database calls.
+
+    Every MongoDB operation made while handling the request runs inside
+    `pymongo.timeout(budget)`, so each one is sent with maxTimeMS set to
+    what is left of the budget and waits for servers, pool connections and
+    replies are capped by it too. Motor copies the context into its
+    executor, so the deadline follows every call. A request whose budget
+    runs out before the response starts gets 503 and is counted in
+    `db_timeouts_total`.
+
+    Budgets are `request_timeouts` per "METHOD /path", else
+    `request_timeout_seconds`; 0 disables the deadline.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._routes = dict(settings.request_timeouts)
+        self._default = settings.request_timeout_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = self._routes.get(f"{scope['method']} {scope['path']}", self._default)
+        if not budget:
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+
+        async def send_tracking(message: Message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            with pymongo.timeout(budget):
+                await self.app(scope, receive, send_tracking)
+        except PyMongoError as e:
+            if not e.timeout or started:
+                raise
+            route = scope.get("route")
+            increment(
+                "db_timeouts_total",
+                route=f"{scope['method']} {route.path if route else scope['path']}",
+                error=type(e).__name__
+            )
+            body = json.dumps({"detail": "The database did not respond in time"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
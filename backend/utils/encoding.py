@@ -0,0 +1,111 @@
+import json
+from functools import lru_cache
+from typing import Literal, Sequence
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import msgpack
+except ImportError:  # optional; without it every client gets JSON
+    msgpack = None
+
+# Content negotiation for bulk list endpoints. Machine clients can ask for
+# MessagePack and/or a columnar layout ("layout=columns" on the media type),
+# which sends each field once with an array of values instead of repeating
+# every key per row:
+#
+#   Accept: application/msgpack
+#   Accept: application/json; layout=columns
+#   Accept: application/msgpack; layout=columns
+#
+# Anything else, including browsers' Accept headers, gets the usual JSON.
+
+Format = Literal["json", "msgpack"]
+Layout = Literal["rows", "columns"]
+
+MSGPACK_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+JSON_TYPES = {"application/json", "application/*", "*/*"}
+
+
+def _media_ranges(accept: str):
+    """Yield (media type, params) from an Accept header, highest quality first."""
+    ranges = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        values = dict(p.split("=", 1) for p in params if "=" in p)
+        values = {key.strip().lower(): value.strip().strip('"') for key, value in values.items()}
+        try:
+            quality = float(values.pop("q", 1))
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            ranges.append((-quality, position, media_type.lower(), values))
+    for _, _, media_type, params in sorted(ranges):
+        yield media_type, params
+
+
+def negotiate(request: Request) -> tuple[Format, Layout]:
+    """
+    Pick the representation of a list response from the Accept header.
+
+    Returns:
+        (format, layout); ("json", "rows") unless the client asked otherwise
+    """
+    for media_type, params in _media_ranges(request.headers.get("accept", "")):
+        layout = "columns" if params.get("layout") == "columns" else "rows"
+        if media_type in MSGPACK_TYPES and msgpack is not None:
+            return "msgpack", layout
+        if media_type in JSON_TYPES:
+            return "json", layout
+    return "json", "rows"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def encode_list(request: Request, response: Response, model: type[BaseModel], items: Sequence[BaseModel]):
+    """
+    Return `items` in the representation the client negotiated.
+
+    Plain JSON returns the items unchanged for FastAPI to serialize as
+    usual. Other representations are dumped in one pass and returned as a
+    ready Response carrying the headers already set on `response` (ETag,
+    X-Next-Cursor, ...). Datetimes are ISO 8601 strings in every format.
+    Endpoints set `Vary: Accept` before their conditional-GET check so
+    304s carry it too.
+
+    Args:
+        request: Current request
+        response: The endpoint's response, whose headers are kept
+        model: Item model; names the columns even when `items` is empty
+        items: Models to send
+
+    Returns:
+        `items`, or a Response with the encoded body
+    """
+    format_, layout = negotiate(request)
+    if format_ == "json" and layout == "rows":
+        return items
+
+    rows = _list_adapter(model).dump_python(list(items), mode="json")
+    if layout == "columns":
+        body = {field: [row[field] for row in rows] for field in model.model_fields}
+    else:
+        body = rows
+
+    if format_ == "msgpack":
+        content = msgpack.packb(body)
+        media_type = "application/msgpack"
+    else:
+        content = json.dumps(body, separators=(",", ":")).encode()
+        media_type = "application/json"
+    if layout == "columns":
+        media_type += "; layout=columns"
+
+    headers = {
+        key: value for key, value in response.headers.items()
+        if key not in ("content-length", "content-type")
+    }
+    return Response(content=content, media_type=media_type, headers=headers)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from config import settings
+
+
+# Put in place of a subscriber's backlog when it overflows: the subscriber
+# has missed events and must reload its state
+RESYNC = {"event": "resync", "data": {}}
+
+
+class EventBus:
+    """
+    In-process publish/subscribe fan-out.
+
+    Each subscriber gets its own bounded queue. A subscriber that falls too
+    far behind has its backlog replaced by a single `RESYNC` marker rather
+    than slowing down publishers.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(topic)
+        if subscribers:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def publish(self, topic: str, event: dict):
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+            else:
+                queue.put_nowait(event)
+
+
+bus = EventBus()
+
+
+# Admin console feed of deposits entering and leaving the pending queue
+PENDING_TOPIC = "admin:pending"
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def deposit_event(deposit: dict) -> dict:
+    """
+    Build the event pushed to a user when one of their deposits changes.
+    """
+    return {
+        "event": "deposit",
+        "data": {
+            "deposit_id": str(deposit["_id"]),
+            "status": deposit["status"],
+            "amount": deposit["amount"],
+            "approved_at": deposit.get("approved_at"),
+            "maturity_date": deposit.get("maturity_date"),
+        },
+    }
+
+
+def emit_deposit_change(deposit: dict):
+    """
+    Notify the owner of a deposit that it changed.
+
+    With the change-stream event source the relay publishes instead, so
+    workers that did not perform the write are notified too.
+    """
+    if settings.event_source == "local":
+        bus.publish(user_topic(deposit["user_id"]), deposit_event(deposit))
+
+
+def pending_event(deposit: dict) -> dict:
+    """
+    Build the pending-queue feed event for a deposit: an insert while it is
+    pending, a removal once it has been decided.
+    """
+    if deposit["status"] == "pending":
+        return {"type": "insert", "deposit": deposit}
+    return {"type": "remove", "deposit_id": str(deposit["_id"])}
+
+
+def emit_pending_change(deposit: dict):
+    """
+    Notify admin consoles that a deposit entered or left the pending queue.
+    """
+    if settings.event_source == "local":
+        bus.publish(PENDING_TOPIC, pending_event(deposit))
+
+
+def format_sse(event: dict) -> str:
+    """
+    Serialize an event in the Server-Sent Events wire format.
+    """
+    return f"event: {event['event']}\ndata: {json.dumps(jsonable_encoder(event['data']))}\n\n"
+
+
+async def run_change_stream_relay(db, resume_after: Optional[dict] = None):
+    """
+    Publish deposit changes observed through a MongoDB change stream.
+
+    Requires a replica set (a single-node replica set is enough). The stream
+    is resumed from the last seen token if the connection drops.
+    """
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+    while True:
+        try:
+            async with db.deposits.watch(
+                pipeline, full_document="updateLookup", resume_after=resume_after
+            ) as stream:
+                async for change in stream:
+                    resume_after = stream.resume_token
+                    deposit = change.get("fullDocument")
+                    if not deposit:
+                        continue
+                    bus.publish(user_topic(deposit["user_id"]), deposit_event(deposit))
+                    updated = change.get("updateDescription", {}).get("updatedFields", {})
+                    if change["operationType"] != "update" or "status" in updated:
+                        bus.publish(PENDING_TOPIC, pending_event(deposit))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Change stream interrupted, reconnecting: {e}")
+            await asyncio.sleep(1)
@@ -0,0 +1,116 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from config import settings
+from repositories import IdempotencyStore, get_repositories
+
+# Completed responses by key. They never change once stored, so the cache
+# needs no invalidation and is safe to keep per worker.
+_completed: OrderedDict[str, dict] = OrderedDict()
+
+
+def _remember(key: str, record: dict):
+    _completed[key] = record
+    _completed.move_to_end(key)
+    if len(_completed) > settings.idempotency_cache_size:
+        _completed.popitem(last=False)
+
+
+def _replay(record: dict, fingerprint: str) -> JSONResponse:
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    return JSONResponse(
+        status_code=record["status_code"],
+        content=record["body"],
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+async def idempotent(
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Run a non-idempotent handler at most once per idempotency key.
+
+    The first request with a key reserves it; its result (or client error) is
+    stored and replayed verbatim to every retry without running the handler
+    again. Completed results are served from an in-memory LRU, otherwise one
+    atomic store operation both looks the key up and reserves it.
+
+    Args:
+        key: Value of the Idempotency-Key header (None runs the handler directly)
+        scope: Namespace for the key, e.g. the user and route
+        payload: Request body; a retry must send the same body
+        handler: Coroutine function performing the operation
+
+    Returns:
+        The handler's result, or a replayed JSONResponse
+    """
+    if key is None:
+        return await handler()
+    if not 0 < len(key) <= 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be 1-255 characters"
+        )
+
+    record_id = f"{scope}:{key}"
+    fingerprint = hashlib.sha256(str(jsonable_encoder(payload)).encode()).hexdigest()
+
+    record = _completed.get(record_id)
+    if record:
+        _completed.move_to_end(record_id)
+        return _replay(record, fingerprint)
+
+    store = get_repositories().idempotency
+    now = datetime.utcnow()
+    existing = await store.reserve(record_id, fingerprint, now)
+    if existing and existing["state"] == "completed":
+        _remember(record_id, existing)
+        return _replay(existing, fingerprint)
+    if existing and not await _take_over_stale(store, record_id, existing, fingerprint, now):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+
+    try:
+        result = await handler()
+    except HTTPException as e:
+        if e.status_code >= 500:
+            await store.release(record_id)
+            raise
+        await _complete(store, record_id, fingerprint, e.status_code, {"detail": e.detail})
+        raise
+    except BaseException:
+        # Nothing was decided; let a retry run the operation again
+        await store.release(record_id)
+        raise
+
+    await _complete(store, record_id, fingerprint, status.HTTP_200_OK, jsonable_encoder(result))
+    return result
+
+
+async def _take_over_stale(store: IdempotencyStore, record_id: str, existing: dict, fingerprint: str, now: datetime) -> bool:
+    """
+    Claim a reservation left behind by a worker that died mid-request.
+    """
+    if now - existing["created_at"] < timedelta(seconds=settings.idempotency_lock_seconds):
+        return False
+    return await store.take_over(record_id, existing["created_at"], fingerprint, now)
+
+
+async def _complete(store: IdempotencyStore, record_id: str, fingerprint: str, status_code: int, body: Any):
+    record = {"fingerprint": fingerprint, "state": "completed", "status_code": status_code, "body": body}
+    await store.complete(record_id, record)
+    _remember(record_id, record)
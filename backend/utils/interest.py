@@ -1,7 +1,14 @@
 from datetime import datetime, timedelta
+from typing import Optional
+from utils.clock import utcnow
 
 
-def calculate_accrued_interest(principal: float, interest_rate: float, start_date: datetime) -> float:
+def calculate_accrued_interest(
+    principal: float,
+    interest_rate: float,
+    start_date: datetime,
+    as_of: Optional[datetime] = None
+) -> float:
     """
     Calculate accrued interest using simple interest formula.
     Interest = Principal × Rate × Time (in months)
@@ -10,11 +17,12 @@ def calculate_accrued_interest(principal: float, interest_rate: float, start_dat
         principal: The principal amount
         interest_rate: Monthly interest rate (e.g., 0.04 for 4%)
         start_date: The date when interest started accruing
+        as_of: The date to calculate interest up to (default: now)
     
     Returns:
         The accrued interest amount
     """
-    now = datetime.utcnow()
+    now = as_of or utcnow()
     days_elapsed = (now - start_date).days
     months_elapsed = days_elapsed / 30.0  # Approximate months
     
@@ -54,7 +62,7 @@ def is_deposit_mature(approval_date: datetime, maturity_days: int = 90) -> bool:
         return False
     
     maturity_date = approval_date + timedelta(days=maturity_days)
-    return datetime.utcnow() >= maturity_date
+    return utcnow() >= maturity_date
 
 
 def days_until_maturity(approval_date: datetime, maturity_days: int = 90) -> int:
@@ -72,7 +80,7 @@ def days_until_maturity(approval_date: datetime, maturity_days: int = 90) -> int
         return None
     
     maturity_date = approval_date + timedelta(days=maturity_days)
-    days_remaining = (maturity_date - datetime.utcnow()).days
+    days_remaining = (maturity_date - utcnow()).days
     return max(0, days_remaining)
 
 
@@ -88,3 +96,18 @@ def calculate_maturity_date(approval_date: datetime, maturity_days: int = 90) ->
         The maturity date
     """
     return approval_date + timedelta(days=maturity_days)
+
+
+def next_accrual_change(start_date: datetime) -> datetime:
+    """
+    Calculate when the accrued interest (and days to maturity) next change.
+    Both are computed from whole days elapsed since the start date.
+    
+    Args:
+        start_date: The date when interest started accruing
+    
+    Returns:
+        The next whole-day boundary after now
+    """
+    days_elapsed = (utcnow() - start_date).days
+    return start_date + timedelta(days=days_elapsed + 1)
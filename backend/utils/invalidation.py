@@ -0,0 +1,98 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Callable
+from config import settings
+from database import get_database
+
+# Cross-worker cache invalidation. In-process caches register a handler for a
+# key prefix, and writes call `invalidate("<prefix>:<key>", ...)`. Handlers
+# always run in the writing worker before `invalidate` returns. With the
+# "change_stream" source the keys are also inserted into the `invalidations`
+# collection, and every other worker applies them from a change stream,
+# usually within milliseconds. The same stream evicts principals when a
+# users document changes, even when a script outside the API changes it.
+# Whenever the stream (re)opens, updates may have been missed in between,
+# so every cache is reset.
+
+WORKER_ID = os.urandom(6).hex()
+
+_handlers: dict[str, Callable[[str], None]] = {}
+_resets: list[Callable[[], None]] = []
+_broadcasts: set[asyncio.Task] = set()
+
+
+def register(prefix: str, evict: Callable[[str], None], reset: Callable[[], None]):
+    """
+    Register an in-process cache.
+
+    Args:
+        prefix: Key prefix the cache owns, e.g. "principal"
+        evict: Called with the rest of each invalidated key
+        reset: Called to drop everything when invalidations may have been missed
+    """
+    _handlers[prefix] = evict
+    _resets.append(reset)
+
+
+def _apply(keys: list[str]):
+    for key in keys:
+        prefix, _, rest = key.partition(":")
+        handler = _handlers.get(prefix)
+        if handler:
+            handler(rest)
+
+
+def reset_all():
+    for reset in _resets:
+        reset()
+
+
+def invalidate(*keys: str):
+    """
+    Evict `keys` from the caches of this worker and, with the change-stream
+    source, of every other worker.
+    """
+    _apply(list(keys))
+    if settings.invalidation_source == "change_stream" and settings.database_backend == "mongo":
+        task = asyncio.get_running_loop().create_task(_broadcast(list(keys)))
+        _broadcasts.add(task)
+        task.add_done_callback(_broadcasts.discard)
+
+
+async def _broadcast(keys: list[str]):
+    try:
+        await get_database().invalidations.insert_one({
+            "keys": keys,
+            "origin": WORKER_ID,
+            "created_at": datetime.utcnow(),  # Real time, for the TTL index
+        })
+    except Exception as e:
+        print(f"Failed to broadcast invalidation of {keys}: {e}")
+
+
+async def run_invalidation_relay(db):
+    """
+    Apply invalidations broadcast by other workers, and evict principals
+    whose users document changed.
+
+    Requires a replica set (a single-node replica set is enough).
+    """
+    pipeline = [{"$match": {"$or": [
+        {"ns.coll": "invalidations", "operationType": "insert"},
+        {"ns.coll": "users", "operationType": {"$in": ["update", "replace", "delete"]}},
+    ]}}]
+    while True:
+        try:
+            async with db.watch(pipeline) as stream:
+                reset_all()
+                async for change in stream:
+                    if change["ns"]["coll"] == "users":
+                        _apply([f"principal:{change['documentKey']['_id']}"])
+                    elif change["fullDocument"]["origin"] != WORKER_ID:
+                        _apply(change["fullDocument"]["keys"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Invalidation stream interrupted, reconnecting: {e}")
+            await asyncio.sleep(1)
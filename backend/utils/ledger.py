@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from utils.accounts import record_transaction
+from utils.archive import find_across_tiers
+from utils.clock import utcnow
+
+# Entry types that add to the user's balance; everything else is a debit.
+CREDIT_TYPES = ("deposit", "interest_accrual")
+
+
+def signed_amount(entry_type: str, amount: float) -> float:
+    """Return the balance delta for a ledger entry of the given type."""
+    return amount if entry_type in CREDIT_TYPES else -amount
+
+
+async def _advance_head(db, user_id: str, delta: float) -> Optional[dict]:
+    return await db.ledger_heads.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"seq": 1, "balance": delta}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _open_ledger(db, user_id: str):
+    """
+    Create the ledger head for a user, carrying over the balance of any
+    transactions written before the ledger existed.
+    """
+    last = await db.transactions.find_one({"user_id": user_id}, sort=[("timestamp", -1)])
+    try:
+        await db.ledger_heads.insert_one({
+            "_id": user_id,
+            "seq": 0,
+            "balance": last["balance_after"] if last else 0.0,
+        })
+    except DuplicateKeyError:
+        return  # Opened concurrently by another writer
+
+    if last:
+        # Opening snapshot so point-in-time balances include the carried-over amount
+        await db.balance_snapshots.insert_one({
+            "user_id": user_id,
+            "seq": 0,
+            "balance": last["balance_after"],
+            "timestamp": last["timestamp"],
+        })
+
+
+async def append_entry(
+    db,
+    user_id: str,
+    entry_type: str,
+    amount: float,
+    description: str,
+    deposit_id: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> dict:
+    """
+    Append an entry to a user's ledger.
+
+    The per-user sequence number and running balance are allocated together
+    with a single atomic update on the user's ledger head, so concurrent
+    writers can never produce duplicate sequence numbers or a torn balance.
+    Every `ledger_snapshot_interval` entries a balance snapshot is written,
+    and the entry is added to the user's account document.
+
+    Args:
+        db: The Motor database
+        user_id: Owner of the ledger
+        entry_type: "deposit", "withdrawal" or "interest_accrual"
+        amount: Positive entry amount
+        description: Human readable description
+        deposit_id: Related deposit, if any
+        timestamp: Entry time (defaults to now)
+
+    Returns:
+        The inserted transaction document
+    """
+    delta = signed_amount(entry_type, amount)
+    head = await _advance_head(db, user_id, delta)
+    if head is None:
+        await _open_ledger(db, user_id)
+        head = await _advance_head(db, user_id, delta)
+
+    entry = {
+        "user_id": user_id,
+        "seq": head["seq"],
+        "deposit_id": deposit_id,
+        "type": entry_type,
+        "amount": amount,
+        "balance_after": round(head["balance"], 2),
+        "timestamp": timestamp or utcnow(),
+        "description": description,
+    }
+    result = await db.transactions.insert_one(entry)
+    entry["_id"] = result.inserted_id
+
+    interval = settings.ledger_snapshot_interval
+    if interval > 0 and entry["seq"] % interval == 0:
+        await db.balance_snapshots.insert_one({
+            "user_id": user_id,
+            "seq": entry["seq"],
+            "balance": entry["balance_after"],
+            "timestamp": entry["timestamp"],
+        })
+
+    await record_transaction(db, entry)
+    return entry
+
+
+async def balance_at(db, user_id: str, as_of: Optional[datetime] = None) -> float:
+    """
+    Calculate a user's balance at a point in time.
+
+    Starts from the nearest snapshot taken at or before `as_of` and replays
+    only the ledger entries recorded after it.
+
+    Args:
+        db: The Motor database
+        user_id: Owner of the ledger
+        as_of: Point in time (defaults to now)
+
+    Returns:
+        The balance at `as_of`
+    """
+    as_of = as_of or utcnow()
+    snapshot = await db.balance_snapshots.find_one(
+        {"user_id": user_id, "timestamp": {"$lte": as_of}},
+        sort=[("seq", -1)],
+    )
+    balance = snapshot["balance"] if snapshot else 0.0
+    after_seq = snapshot["seq"] if snapshot else 0
+
+    tail = await find_across_tiers(
+        db,
+        {"user_id": user_id, "seq": {"$gt": after_seq}, "timestamp": {"$lte": as_of}},
+        [("seq", 1)],
+    )
+    for entry in tail:
+        balance += signed_amount(entry["type"], entry["amount"])
+
+    return round(balance, 2)
+
+
+async def ledger_entries(db, user_id: str, start: datetime, end: datetime) -> list[dict]:
+    """
+    Get ledger entries recorded in (start, end], ordered by sequence number.
+    """
+    return await find_across_tiers(
+        db,
+        {"user_id": user_id, "seq": {"$exists": True}, "timestamp": {"$gt": start, "$lte": end}},
+        [("seq", 1)],
+    )
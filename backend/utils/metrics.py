@@ -0,0 +1,44 @@
+from collections import defaultdict
+
+# Process-wide counters, exposed at /metrics in the Prometheus text format.
+# Each worker counts separately; the scraper sums them.
+_counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = defaultdict(lambda: defaultdict(float))
+_help: dict[str, str] = {}
+
+
+def describe(name: str, help_text: str):
+    """Register the HELP text shown for a counter."""
+    _help[name] = help_text
+
+
+def increment(name: str, amount: float = 1, **labels: str):
+    """
+    Add to a counter.
+
+    Args:
+        name: Metric name, e.g. "db_timeouts_total"
+        amount: Value to add
+        labels: Label values identifying the series
+    """
+    _counters[name][tuple(sorted(labels.items()))] += amount
+
+
+def value(name: str, **labels: str) -> float:
+    return _counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+
+def render() -> str:
+    """Render all counters in the Prometheus text exposition format."""
+    lines = []
+    for name, series in sorted(_counters.items()):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, total in series.items():
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f"{name}{{{label_text}}} {total:g}" if label_text else f"{name} {total:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,57 @@
+import base64
+from bson import json_util
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode the sort-key values of the last returned item as an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types) -> list:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor: The cursor sent by the client
+        types: Expected type (or tuple of types) of each sort-key value
+
+    Raises:
+        HTTPException: 400 if the cursor doesn't decode to one value of
+            the expected type per sort key
+    """
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        values = None
+    if not (
+        isinstance(values, list)
+        and len(values) == len(types)
+        and all(isinstance(value, kind) for value, kind in zip(values, types))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
+
+
+def keyset_filter(fields: list[tuple[str, int]], values: list) -> dict:
+    """
+    Build a filter matching the documents that sort after `values`.
+
+    Args:
+        fields: Sort specification, e.g. [("timestamp", -1), ("_id", -1)]
+        values: Sort-key values of the last item on the previous page
+
+    Returns:
+        A MongoDB filter expression
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(fields):
+        clause = {f: v for (f, _), v in zip(fields[:i], values[:i])}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+import numpy as np
+
+DAYS_PER_MONTH = 30.0  # Same approximation as utils.interest
+
+ProjectionMode = Literal["rollover", "full"]
+
+
+def day_grid(horizon_days: int, step_days: int, days: Optional[list[int]] = None) -> np.ndarray:
+    """
+    Build the grid of day offsets (from now) at which balances are projected.
+
+    Args:
+        horizon_days: Last day of the projection
+        step_days: Spacing of the grid
+        days: Explicit offsets to use instead of a regular grid (negative
+            ones are ignored: projections never look back)
+
+    Returns:
+        Sorted, unique day offsets including 0 and `horizon_days`
+    """
+    if days:
+        grid = np.asarray(days, dtype=np.int64)
+    else:
+        grid = np.arange(0, horizon_days + 1, step_days, dtype=np.int64)
+    return np.unique(np.concatenate([[0], grid[(grid >= 0) & (grid <= horizon_days)], [horizon_days]]))
+
+
+def project_deposits(
+    principals: np.ndarray,
+    rates: np.ndarray,
+    days_elapsed: np.ndarray,
+    grid: np.ndarray,
+    mode: ProjectionMode = "rollover",
+    maturity_days: int = 90,
+) -> dict[str, np.ndarray]:
+    """
+    Project balances and payouts for a batch of deposits over a day grid.
+
+    Payouts are assumed to be taken on each maturity date, or immediately for
+    deposits that are already mature. "rollover" withdraws the interest and
+    restarts the lock period, like an interest withdrawal; "full" withdraws
+    principal and interest at the first maturity.
+
+    Args:
+        principals: Principal per deposit, shape (N,)
+        rates: Monthly interest rate per deposit, shape (N,)
+        days_elapsed: Whole days since each deposit's current cycle started, shape (N,)
+        grid: Day offsets from now, shape (G,)
+        mode: "rollover" or "full"
+        maturity_days: Lock period in days
+
+    Returns:
+        Arrays of shape (N, G): "accrued_interest", "balance" (principal plus
+        unpaid interest still held) and "cumulative_payout"; plus "first_payout_day",
+        "first_payout" and "later_payout" (each subsequent rollover) of shape (N,)
+    """
+    principal = np.asarray(principals, dtype=np.float64)[:, None]
+    rate = np.asarray(rates, dtype=np.float64)[:, None]
+    elapsed = np.asarray(days_elapsed, dtype=np.int64)[:, None]
+    grid = np.asarray(grid, dtype=np.int64)[None, :]
+
+    daily_interest = principal * rate / DAYS_PER_MONTH
+    first_day = np.maximum(maturity_days - elapsed, 0)
+    first_interest = daily_interest * np.maximum(elapsed, maturity_days)
+    paid = grid >= first_day
+
+    if mode == "rollover":
+        payouts_taken = np.where(paid, (grid - first_day) // maturity_days + 1, 0)
+        cycle_interest = daily_interest * maturity_days
+        cumulative_payout = np.where(paid, first_interest + (payouts_taken - 1) * cycle_interest, 0.0)
+        days_accruing = np.where(paid, grid - first_day - (payouts_taken - 1) * maturity_days, elapsed + grid)
+        accrued_interest = daily_interest * days_accruing
+        balance = principal + accrued_interest
+        first_payout = first_interest
+        later_payout = cycle_interest
+    else:
+        first_payout = principal + first_interest
+        later_payout = np.zeros_like(principal)
+        cumulative_payout = np.where(paid, first_payout, 0.0)
+        accrued_interest = np.where(paid, 0.0, daily_interest * (elapsed + grid))
+        balance = np.where(paid, 0.0, principal + accrued_interest)
+
+    return {
+        "accrued_interest": np.round(accrued_interest, 2),
+        "balance": np.round(balance, 2),
+        "cumulative_payout": np.round(cumulative_payout, 2),
+        "first_payout_day": first_day[:, 0],
+        "first_payout": np.round(first_payout[:, 0], 2),
+        "later_payout": np.round(later_payout[:, 0], 2),
+    }
+
+
+def payout_days(first_day: int, horizon_days: int, mode: ProjectionMode, maturity_days: int = 90) -> np.ndarray:
+    """
+    Day offsets of the payouts taken within the horizon for one deposit.
+    """
+    if first_day > horizon_days:
+        return np.empty(0, dtype=np.int64)
+    if mode == "full":
+        return np.array([first_day], dtype=np.int64)
+    return np.arange(first_day, horizon_days + 1, maturity_days, dtype=np.int64)
+
+
+def elapsed_days(cycle_starts: list[datetime], now: datetime) -> np.ndarray:
+    """
+    Whole days since each cycle start, matching `calculate_accrued_interest`.
+    """
+    starts = np.array(cycle_starts, dtype="datetime64[us]")
+    return ((np.datetime64(now, "us") - starts) // np.timedelta64(1, "D")).astype(np.int64)
+
+
+def grid_dates(now: datetime, grid: np.ndarray) -> list[datetime]:
+    return [now + timedelta(days=int(day)) for day in grid]
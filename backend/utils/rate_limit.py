@@ -0,0 +1,184 @@
+import inspect
+import json
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+import pymongo
+from jose import JWTError, jwt
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config import settings
+from database import get_database
+from utils.metrics import describe, increment
+
+describe("rate_limit_fallbacks_total", "Requests rate-limited in worker memory because MongoDB was slow or failing")
+
+
+class MemoryRateLimitStore:
+    """
+    Token buckets held in process memory. Each worker limits independently.
+
+    At most `max_keys` buckets are kept. The least recently used one makes
+    room for a new key, so flooding the table with fresh identities only
+    ever resets the quietest clients, never everyone's limits.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated), oldest first
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from a bucket.
+
+        Returns:
+            0 if the request is allowed, else seconds until a token is available
+        """
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)  # Re-inserted below as the most recent
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+class MongoRateLimitStore:
+    """
+    Token buckets shared by all workers through MongoDB.
+
+    Each request is a single atomic pipeline update, so concurrent workers
+    never over-grant. Idle buckets expire through a TTL index.
+
+    The update may take `timeout` seconds. If MongoDB is slower or fails,
+    the limiter fails open to this worker's in-memory buckets: requests
+    stay limited per worker rather than waiting on the database or being
+    rejected outright. After a failure MongoDB is skipped for
+    `retry_seconds`, since an unreachable server costs every attempt at
+    least the driver's 0.5s server selection interval. Each fallback is
+    counted in `rate_limit_fallbacks_total`.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, retry_seconds: float = 5.0):
+        self.timeout = settings.rate_limit_timeout_seconds if timeout is None else timeout
+        self.retry_seconds = retry_seconds
+        self.fallback = MemoryRateLimitStore()
+        self._retry_at = 0.0
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        if time.monotonic() < self._retry_at:
+            increment("rate_limit_fallbacks_total", error="recent_failure")
+            return self.fallback.take(key, rate, burst)
+        try:
+            with pymongo.timeout(self.timeout):
+                return await self._take(key, rate, burst)
+        except PyMongoError as e:
+            self._retry_at = time.monotonic() + self.retry_seconds
+            increment("rate_limit_fallbacks_total", error=type(e).__name__)
+            return self.fallback.take(key, rate, burst)
+
+    async def _take(self, key: str, rate: float, burst: int) -> float:
+        now = time.time()
+        refilled = {
+            "$min": [
+                burst,
+                {"$add": [
+                    {"$ifNull": ["$tokens", burst]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated", now]}]}, rate]},
+                ]},
+            ]
+        }
+        bucket = await get_database().rate_limits.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": refilled,
+                    "updated": now,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=burst / rate),
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / rate
+
+
+class RateLimitMiddleware:
+    """
+    Per-user, per-route token-bucket rate limiting.
+
+    Requests are identified by the `sub` of a valid bearer token, falling
+    back to the client address. Routes listed in `rate_limit_routes` (as
+    "METHOD /path") get their own bucket; all other requests share one
+    default bucket per identity. Rejected requests get 429 with Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp, store=None):
+        self.app = app
+        self.store = store or MemoryRateLimitStore()
+        self._routes = {route: tuple(limit) for route, limit in settings.rate_limit_routes.items()}
+        self._default = (settings.rate_limit_rate, settings.rate_limit_burst)
+        self._subjects: dict[str, Optional[str]] = {}  # token -> sub, bounded
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        limit = self._routes.get(route)
+        if limit is None:
+            route, limit = "*", self._default
+
+        wait = self.store.take(f"{self._identity(scope)}|{route}", *limit)
+        if inspect.isawaitable(wait):
+            wait = await wait
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _identity(self, scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                token = value[7:].decode("latin-1")
+                if token not in self._subjects:
+                    if len(self._subjects) >= 10_000:
+                        self._subjects.clear()
+                    self._subjects[token] = self._decode_subject(token)
+                subject = self._subjects[token]
+                if subject:
+                    return f"user:{subject}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    @staticmethod
+    def _decode_subject(token: str) -> Optional[str]:
+        try:
+            payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            return None
+        return payload.get("sub")
@@ -0,0 +1,402 @@
+import heapq
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, NamedTuple, Optional
+import certifi
+from pymongo import MongoClient
+from utils.archive import TIERS
+from utils.clock import utcnow
+from utils.interest import calculate_accrued_interest, calculate_maturity_date
+from utils.ledger import signed_amount
+
+# Amounts are rounded to cents when written; anything closer than this agrees.
+TOLERANCE = 0.01
+
+# An interest withdrawal resets approved_at just before it stamps its ledger
+# entries, so the two are allowed to differ by this much.
+CYCLE_START_SKEW = timedelta(seconds=5)
+
+DEPOSIT_FIELDS = {"user_id": 1, "amount": 1, "interest_rate": 1, "status": 1, "submitted_at": 1, "approved_at": 1}
+ENTRY_FIELDS = {"user_id": 1, "seq": 1, "deposit_id": 1, "type": 1, "amount": 1, "balance_after": 1, "timestamp": 1}
+
+
+class Discrepancy(NamedTuple):
+    user_id: str
+    deposit_id: Optional[str]  # None for problems with the ledger as a whole
+    kind: str  # e.g. "balance_after_mismatch", "interest_mismatch"
+    detail: str
+
+
+class PartitionReport(NamedTuple):
+    users: int
+    deposits: int
+    entries: int
+    principal_held: float  # Approved principal according to `deposits`
+    ledger_balance: float  # Sum of replayed ledger balances
+    accrued_interest: float  # Interest owed on approved deposits as of the run
+    discrepancy_count: int
+    discrepancies: list[Discrepancy]  # At most `max_reported`
+
+
+def partition_bounds(db, partitions: int) -> list[tuple[Optional[str], Optional[str]]]:
+    """
+    Split the user id space into ranges holding roughly equal numbers of users.
+
+    Ledger documents store user ids as hex strings, which sort like the
+    ObjectIds they came from. The first and last ranges are open-ended so
+    ids missing from `users` are still covered.
+
+    Args:
+        db: A synchronous PyMongo database
+        partitions: Number of ranges wanted
+
+    Returns:
+        (lower, upper) bounds, lower inclusive and upper exclusive; None is unbounded
+    """
+    if partitions <= 1:
+        return [(None, None)]
+    buckets = db.users.aggregate(
+        [{"$bucketAuto": {"groupBy": "$_id", "buckets": partitions}}],
+        allowDiskUse=True,
+    )
+    cuts = [str(bucket["_id"]["min"]) for bucket in buckets][1:]
+    edges = [None, *cuts, None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _range(field: str, lower: Optional[str], upper: Optional[str]) -> dict:
+    bounds = {}
+    if lower is not None:
+        bounds["$gte"] = lower
+    if upper is not None:
+        bounds["$lt"] = upper
+    return {field: bounds} if bounds else {}
+
+
+def _group(docs: Iterable[dict], field: str = "user_id") -> Iterator[tuple[str, list[dict]]]:
+    for user_id, group in itertools.groupby(docs, key=lambda doc: doc[field]):
+        yield user_id, list(group)
+
+
+def _by_user(*streams: Iterator[tuple[str, list[dict]]]) -> Iterator[tuple[str, list[list[dict]]]]:
+    """
+    Walk several per-user streams sorted by user id in step, yielding each
+    user id with its group from every stream ([] where it has none).
+    """
+    heads = [next(stream, None) for stream in streams]
+    while any(heads):
+        user_id = min(head[0] for head in heads if head)
+        groups = []
+        for i, head in enumerate(heads):
+            if head and head[0] == user_id:
+                groups.append(head[1])
+                heads[i] = next(streams[i], None)
+            else:
+                groups.append([])
+        yield user_id, groups
+
+
+def replay_ledger(
+    user_id: str,
+    entries: list[dict],
+    snapshots: list[dict],
+    head: Optional[dict],
+) -> tuple[float, list[Discrepancy]]:
+    """
+    Replay a user's ledger in sequence order and check every stored balance.
+    Stored balances come from the ledger head, not the previous entry, so a
+    bad one is reported once rather than for every entry after it.
+
+    Args:
+        user_id: Owner of the ledger
+        entries: Sequenced entries from all tiers, by seq (duplicates allowed)
+        snapshots: The user's balance snapshots, any order
+        head: The user's ledger head, or None to skip checking it
+
+    Returns:
+        The replayed balance and the problems found
+    """
+    found = []
+    by_seq = {snapshot["seq"]: snapshot["balance"] for snapshot in snapshots}
+    balance = by_seq.get(0, 0.0)  # Carried over from before the ledger existed
+    expected_seq = 1
+    previous = None
+
+    for entry in entries:
+        if previous and entry["seq"] == previous["seq"]:
+            if entry["_id"] != previous["_id"]:
+                found.append(Discrepancy(user_id, None, "duplicate_seq", f"seq {entry['seq']} used twice"))
+            continue  # Same entry seen in both tiers mid-archive
+        previous = entry
+
+        if entry["seq"] != expected_seq:
+            found.append(Discrepancy(
+                user_id, None, "seq_gap", f"expected seq {expected_seq}, found {entry['seq']}"
+            ))
+        expected_seq = entry["seq"] + 1
+
+        balance = round(balance + signed_amount(entry["type"], entry["amount"]), 2)
+        if abs(balance - entry["balance_after"]) >= TOLERANCE:
+            found.append(Discrepancy(
+                user_id, None, "balance_after_mismatch",
+                f"seq {entry['seq']}: replayed {balance:.2f}, stored {entry['balance_after']:.2f}"
+            ))
+        if entry["seq"] in by_seq and abs(balance - by_seq[entry["seq"]]) >= TOLERANCE:
+            found.append(Discrepancy(
+                user_id, None, "snapshot_mismatch",
+                f"seq {entry['seq']}: replayed {balance:.2f}, snapshot {by_seq[entry['seq']]:.2f}"
+            ))
+
+    if balance <= -TOLERANCE:
+        found.append(Discrepancy(user_id, None, "negative_balance", f"balance {balance:.2f}"))
+    if head and (head["seq"] != expected_seq - 1 or abs(head["balance"] - balance) >= TOLERANCE):
+        found.append(Discrepancy(
+            user_id, None, "ledger_head_mismatch",
+            f"head seq {head['seq']} balance {head['balance']:.2f}, "
+            f"replayed seq {expected_seq - 1} balance {balance:.2f}"
+        ))
+    return balance, found
+
+
+def replay_deposit(user_id: str, deposit: dict, entries: list[dict]) -> list[Discrepancy]:
+    """
+    Check a deposit's ledger entries against what approve_deposit and
+    withdraw_funds write for it.
+
+    Approval writes one "deposit" entry for the principal. Each withdrawal
+    writes an "interest_accrual" entry (when interest is due) for the
+    interest accrued since the cycle started, then a "withdrawal" of either
+    that interest, which starts a new cycle, or principal plus interest,
+    which closes the deposit. Withdrawals are only allowed after maturity.
+
+    Args:
+        user_id: Owner of the deposit
+        deposit: The deposit document
+        entries: Ledger entries referencing the deposit, by seq
+
+    Returns:
+        The problems found
+    """
+    deposit_id = str(deposit["_id"])
+    found = []
+
+    def report(kind: str, detail: str):
+        found.append(Discrepancy(user_id, deposit_id, kind, detail))
+
+    if deposit["status"] in ("pending", "rejected"):
+        if entries:
+            report("unexpected_entries", f"{len(entries)} entries for a {deposit['status']} deposit")
+        return found
+
+    if not entries or entries[0]["type"] != "deposit":
+        report("missing_deposit_entry", f"{deposit['status']} deposit has no principal credit")
+        return found
+    first = entries[0]
+    if abs(first["amount"] - deposit["amount"]) >= TOLERANCE:
+        report("deposit_amount_mismatch", f"credited {first['amount']:.2f}, deposit is {deposit['amount']:.2f}")
+
+    principal = deposit["amount"]
+    cycle_start = first["timestamp"]
+    closed = False
+    pending = iter(entries[1:])
+    for entry in pending:
+        if closed:
+            report("entry_after_close", f"seq {entry['seq']} {entry['type']}")
+            continue
+
+        expected = calculate_accrued_interest(principal, deposit["interest_rate"], cycle_start, as_of=entry["timestamp"])
+        interest = 0.0
+        if entry["type"] == "interest_accrual":
+            interest = entry["amount"]
+            entry = next(pending, None)
+            if entry is None or entry["type"] != "withdrawal":
+                report("interest_without_withdrawal", f"interest {interest:.2f} credited but not paid out")
+                continue
+        elif entry["type"] != "withdrawal":
+            report("unexpected_entry_type", f"seq {entry['seq']} {entry['type']}")
+            continue
+
+        if abs(interest - expected) >= TOLERANCE:
+            report("interest_mismatch", f"seq {entry['seq']}: credited {interest:.2f}, expected {expected:.2f}")
+        if entry["timestamp"] < calculate_maturity_date(cycle_start):
+            report("early_withdrawal", f"seq {entry['seq']} at {entry['timestamp']:%Y-%m-%d}, cycle from {cycle_start:%Y-%m-%d}")
+
+        if abs(entry["amount"] - interest) < TOLERANCE:
+            cycle_start = entry["timestamp"]
+        elif abs(entry["amount"] - (principal + interest)) < TOLERANCE:
+            closed = True
+        else:
+            report(
+                "withdrawal_amount_mismatch",
+                f"seq {entry['seq']}: paid {entry['amount']:.2f}, interest {interest:.2f}, principal {principal:.2f}"
+            )
+
+    if deposit["status"] == "withdrawn" and not closed:
+        report("unpaid_withdrawal", "deposit is withdrawn but the principal was never paid out")
+    if deposit["status"] == "approved":
+        if closed:
+            report("paid_out_while_active", "principal paid out but deposit is still approved")
+        elif not deposit.get("approved_at") or abs(deposit["approved_at"] - cycle_start) > CYCLE_START_SKEW:
+            report("cycle_start_mismatch", f"approved_at {deposit.get('approved_at')}, ledger cycle from {cycle_start}")
+    return found
+
+
+def reconcile_partition(
+    db,
+    lower: Optional[str],
+    upper: Optional[str],
+    as_of: datetime,
+    batch_size: int = 5000,
+    max_reported: int = 1000,
+) -> PartitionReport:
+    """
+    Reconcile every user whose id falls in [lower, upper).
+
+    Deposits, sequenced entries from both transaction tiers, balance
+    snapshots and ledger heads are each read with one streaming cursor in
+    user id order and walked in step, so only one user's documents are held
+    in memory at a time. Entries written after `as_of` are ignored;
+    deposits are checked in their current state, so writes landing during
+    the run can show up as discrepancies that a re-run clears.
+
+    Args:
+        db: A synchronous PyMongo database
+        lower: Inclusive lower bound of user ids (None for unbounded)
+        upper: Exclusive upper bound of user ids (None for unbounded)
+        as_of: Point in time to reconcile at
+        batch_size: Cursor batch size
+        max_reported: Discrepancies kept in the report (all are counted)
+
+    Returns:
+        Totals and discrepancies for the partition
+    """
+    users_range = _range("user_id", lower, upper)
+    tiers = [
+        db[tier].find(
+            {**users_range, "seq": {"$exists": True}, "timestamp": {"$lte": as_of}},
+            ENTRY_FIELDS,
+            batch_size=batch_size,
+        ).sort([("user_id", 1), ("seq", 1)])
+        for tier in TIERS
+    ]
+    entries = heapq.merge(*tiers, key=lambda entry: (entry["user_id"], entry["seq"]))
+    # Walks the (user_id, submitted_at, _id) index, so no partition needs an
+    # in-memory sort; each user's deposits come newest first
+    deposits = db.deposits.find(
+        {**users_range, "submitted_at": {"$lte": as_of}}, DEPOSIT_FIELDS, batch_size=batch_size
+    ).sort([("user_id", 1), ("submitted_at", -1), ("_id", -1)])
+    snapshots = db.balance_snapshots.find(
+        {**users_range, "timestamp": {"$lte": as_of}}, {"user_id": 1, "seq": 1, "balance": 1, "timestamp": 1}, batch_size=batch_size
+    ).sort([("user_id", 1), ("seq", -1)])
+    heads = db.ledger_heads.find(_range("_id", lower, upper), batch_size=batch_size).sort("_id", 1)
+
+    users = deposit_count = entry_count = discrepancy_count = 0
+    principal_held = ledger_balance = accrued_interest = 0.0
+    reported = []
+
+    streams = (_group(entries), _group(deposits), _group(snapshots), _group(heads, "_id"))
+    for user_id, (user_entries, user_deposits, user_snapshots, user_head) in _by_user(*streams):
+        users += 1
+        entry_count += len(user_entries)
+        deposit_count += len(user_deposits)
+
+        head = user_head[0] if user_head else None
+        last_seq = user_entries[-1]["seq"] if user_entries else 0
+        balance, found = replay_ledger(
+            user_id,
+            user_entries,
+            user_snapshots,
+            head if head and head["seq"] <= last_seq else None  # Else moved on since as_of
+        )
+        if user_entries and not head:
+            found.append(Discrepancy(user_id, None, "missing_ledger_head", f"{len(user_entries)} entries"))
+        ledger_balance += balance
+
+        opened = next((s for s in user_snapshots if s["seq"] == 0), None)
+        by_deposit = {}
+        for entry in user_entries:
+            by_deposit.setdefault(entry.get("deposit_id"), []).append(entry)
+        for deposit in reversed(user_deposits):
+            if opened and deposit["submitted_at"] <= opened["timestamp"]:
+                continue  # Settled before the ledger existed
+            found += replay_deposit(user_id, deposit, _unique(by_deposit.pop(str(deposit["_id"]), [])))
+            if deposit["status"] == "approved":
+                principal_held += deposit["amount"]
+                if deposit.get("approved_at"):
+                    accrued_interest += calculate_accrued_interest(
+                        deposit["amount"], deposit["interest_rate"], deposit["approved_at"], as_of=as_of
+                    )
+        for deposit_id, orphans in by_deposit.items():
+            if deposit_id is not None:
+                found.append(Discrepancy(user_id, deposit_id, "unknown_deposit", f"{len(orphans)} entries"))
+
+        discrepancy_count += len(found)
+        reported.extend(found[:max(0, max_reported - len(reported))])
+
+    return PartitionReport(
+        users, deposit_count, entry_count,
+        round(principal_held, 2), round(ledger_balance, 2), round(accrued_interest, 2),
+        discrepancy_count, reported
+    )
+
+
+def _unique(entries: list[dict]) -> list[dict]:
+    # Drop copies of an entry read from both tiers
+    unique = []
+    for entry in entries:
+        if not unique or entry["seq"] != unique[-1]["seq"]:
+            unique.append(entry)
+    return unique
+
+
+def _reconcile_range(uri: str, database_name: str, *args) -> PartitionReport:
+    # Runs in a worker process; clients can't be shared across a fork
+    client = MongoClient(uri, tlsCAFile=certifi.where())
+    try:
+        return reconcile_partition(client[database_name], *args)
+    finally:
+        client.close()
+
+
+def run_reconciliation(
+    uri: str,
+    database_name: str,
+    as_of: Optional[datetime] = None,
+    partitions: int = 0,
+    workers: int = 0,
+    batch_size: int = 5000,
+    max_reported: int = 1000,
+) -> Iterator[tuple[tuple[Optional[str], Optional[str]], PartitionReport]]:
+    """
+    Reconcile the whole book, one user id range at a time.
+
+    With `workers`, ranges are reconciled in a process pool, each worker
+    reading its range over its own connection; `partitions` defaults to
+    four per worker so stragglers even out. `as_of` defaults to now on
+    this process's clock, which under CLOCK=simulated is not the API's.
+
+    Yields:
+        ((lower, upper), report) per range, in range order
+    """
+    as_of = as_of or utcnow()
+    partitions = partitions or max(1, 4 * workers)
+    client = MongoClient(uri, tlsCAFile=certifi.where())
+    try:
+        bounds = partition_bounds(client[database_name], partitions)
+        if workers <= 0:
+            for lower, upper in bounds:
+                yield (lower, upper), reconcile_partition(
+                    client[database_name], lower, upper, as_of, batch_size, max_reported
+                )
+            return
+    finally:
+        client.close()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_reconcile_range, uri, database_name, lower, upper, as_of, batch_size, max_reported)
+            for lower, upper in bounds
+        ]
+        for bound, future in zip(bounds, futures):
+            yield bound, future.result()
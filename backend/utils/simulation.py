@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator, NamedTuple, Optional
+import numpy as np
+from utils.clock import utcnow
+from utils.projection import ProjectionMode, project_deposits
+
+
+class Scenario(NamedTuple):
+    interest_rate: float  # Monthly rate applied to every deposit
+    maturity_days: int
+
+
+def iter_deposit_chunks(collection, now: datetime, chunk_size: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream approved deposits as (principals, days_elapsed) array chunks.
+
+    Args:
+        collection: A synchronous PyMongo `deposits` collection
+        now: Reference time for elapsed days
+        chunk_size: Deposits per chunk (also the cursor batch size)
+
+    Yields:
+        Principal and whole days since the current cycle started, shape (chunk,)
+    """
+    cursor = collection.find(
+        {"status": "approved"},
+        {"_id": 0, "amount": 1, "approved_at": 1},
+        batch_size=chunk_size,
+    )
+    now64 = np.datetime64(now, "us")
+    amounts, starts = [], []
+    for deposit in cursor:
+        amounts.append(deposit["amount"])
+        starts.append(deposit["approved_at"])
+        if len(amounts) == chunk_size:
+            yield _to_arrays(amounts, starts, now64)
+            amounts, starts = [], []
+    if amounts:
+        yield _to_arrays(amounts, starts, now64)
+
+
+def _to_arrays(amounts: list, starts: list, now64: np.datetime64) -> tuple[np.ndarray, np.ndarray]:
+    elapsed = (now64 - np.array(starts, dtype="datetime64[us]")) // np.timedelta64(1, "D")
+    return np.array(amounts, dtype=np.float64), elapsed.astype(np.int64)
+
+
+def evaluate_chunk(
+    principals: np.ndarray,
+    days_elapsed: np.ndarray,
+    scenarios: list[Scenario],
+    grid: np.ndarray,
+    mode: ProjectionMode,
+) -> np.ndarray:
+    """
+    Evaluate every scenario against one chunk of deposits.
+
+    Returns:
+        Array of shape (S, 2, G): per scenario, the total balance held and the
+        cumulative payout on each grid day
+    """
+    totals = np.empty((len(scenarios), 2, len(grid)))
+    for i, scenario in enumerate(scenarios):
+        projection = project_deposits(
+            principals,
+            np.full(len(principals), scenario.interest_rate),
+            days_elapsed,
+            grid,
+            mode,
+            maturity_days=scenario.maturity_days,
+        )
+        totals[i, 0] = projection["balance"].sum(axis=0)
+        totals[i, 1] = projection["cumulative_payout"].sum(axis=0)
+    return totals
+
+
+def run_simulation(
+    collection,
+    scenarios: list[Scenario],
+    grid: np.ndarray,
+    mode: ProjectionMode = "rollover",
+    now: Optional[datetime] = None,
+    chunk_size: int = 100_000,
+    workers: int = 0,
+) -> tuple[int, np.ndarray]:
+    """
+    Evaluate rate/lock-period scenarios across the whole book.
+
+    Deposits are streamed in chunks so memory stays bounded. With `workers`,
+    chunks are evaluated in a process pool while the next ones are read;
+    at most two chunks per worker are in flight.
+
+    Returns:
+        The number of deposits and an (S, 2, G) array as in `evaluate_chunk`,
+        summed over all chunks
+    """
+    now = now or utcnow()
+    totals = np.zeros((len(scenarios), 2, len(grid)))
+    count = 0
+    chunks = iter_deposit_chunks(collection, now, chunk_size)
+
+    if workers <= 0:
+        for principals, elapsed in chunks:
+            count += len(principals)
+            totals += evaluate_chunk(principals, elapsed, scenarios, grid, mode)
+        return count, totals
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for principals, elapsed in chunks:
+            count += len(principals)
+            pending.append(pool.submit(evaluate_chunk, principals, elapsed, scenarios, grid, mode))
+            if len(pending) >= 2 * workers:
+                totals += pending.pop(0).result()
+        for future in pending:
+            totals += future.result()
+    return count, totals
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Optional
+import anyio
+from fastapi import HTTPException, UploadFile, status
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+
+CHUNK_SIZE = 1024 * 1024
+PROOF_UPLOAD_PATH = "/user/deposit/proof"
+MULTIPART_OVERHEAD = 64 * 1024  # Boundaries and part headers around the file
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def proof_path(sha256: str) -> str:
+    """
+    Get the on-disk location of a stored proof, fanned out by hash prefix.
+    """
+    if not _SHA256_RE.match(sha256):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proof not found"
+        )
+    return os.path.join(settings.proof_storage_dir, sha256[:2], sha256)
+
+
+async def store_upload(upload: UploadFile) -> tuple[str, int]:
+    """
+    Stream an upload to content-addressed storage.
+
+    The file is copied chunk by chunk into a temporary file while it is
+    hashed, then renamed to its SHA-256. If identical content is already
+    stored, the copy is discarded.
+
+    Args:
+        upload: The uploaded file
+
+    Returns:
+        The SHA-256 hex digest and the size in bytes
+    """
+    os.makedirs(settings.proof_storage_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=settings.proof_storage_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.proof_max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Proof exceeds the {settings.proof_max_bytes} byte limit"
+                    )
+                digest.update(chunk)
+                await anyio.to_thread.run_sync(tmp.write, chunk)
+
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Proof file is empty"
+            )
+
+        sha256 = digest.hexdigest()
+        path = proof_path(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return sha256, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range `Range` header.
+
+    Args:
+        header: The Range header value, if any
+        size: Size of the resource in bytes
+
+    Returns:
+        Inclusive (start, end) byte offsets, or None to serve the whole file
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # Multiple or malformed ranges: serve the whole file
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """
+    ASGI response that streams a byte range of a file.
+
+    Uses the server's `http.response.zerocopysend` extension when offered,
+    so the kernel copies the file straight to the socket; otherwise falls
+    back to reading fixed-size chunks.
+    """
+
+    def __init__(self, path: str, size: int, media_type: str, byte_range: Optional[tuple[int, int]] = None):
+        self.path = path
+        self.start, self.end = byte_range or (0, size - 1)
+        headers = {
+            "content-length": str(self.end - self.start + 1),
+            "accept-ranges": "bytes",
+            "x-content-type-options": "nosniff",
+        }
+        if byte_range:
+            headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+        super().__init__(
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Open the file before sending headers, so a missing file is a 404
+        # rather than a response that breaks off after its headers
+        try:
+            file = await anyio.open_file(self.path, "rb")
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proof file is missing"
+            )
+
+        async with file:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            count = self.end - self.start + 1
+
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped.fileno(),
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                return
+
+            more_body = True
+            await file.seek(self.start)
+            while more_body:
+                chunk = await file.read(min(CHUNK_SIZE, count))
+                count -= len(chunk)
+                more_body = bool(chunk) and count > 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+class UploadLimitMiddleware:
+    """
+    Enforce `proof_max_bytes` on proof uploads while the body arrives.
+
+    Starlette spools a multipart body to a temporary file before the
+    endpoint runs, so the check in `store_upload` alone would only fire
+    after an oversized upload had been received in full. This rejects it
+    up front from Content-Length, or with 413 as soon as a body without
+    one grows past the limit.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != PROOF_UPLOAD_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.proof_max_bytes + MULTIPART_OVERHEAD
+        too_large = HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Proof exceeds the {settings.proof_max_bytes} byte limit"
+        )
+        length = dict(scope["headers"]).get(b"content-length")
+        if length and length.isdigit() and int(length) > limit:
+            body = json.dumps({"detail": too_large.detail}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": too_large.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise too_large  # Surfaces from the form parser as a 413 response
+            return message
+
+        await self.app(scope, receive_limited, send)
@@ -0,0 +1,109 @@
+import calendar
+import os
+import zlib
+from datetime import datetime
+from typing import Optional
+from fastapi import Request, Response
+from utils.encoding import negotiate
+from utils.clock import utcnow
+from utils.invalidation import invalidate, register
+
+# Versions for conditional GETs. A scope is bumped by every write that can
+# change what a read endpoint returns: "user:<id>" for one user's deposits
+# and transactions, "deposits" and "users" for the admin lists. Each bump
+# carries a random token that every worker records for the scope through
+# the invalidation bus, so workers that have seen the same bumps build the
+# same ETags and any of them can answer a client's If-None-Match. A scope
+# this process holds no token for (not bumped since it started, or bumps
+# possibly missed while the bus was down) uses a per-process marker
+# instead, so those ETags never match another process's until the next bump.
+_unknown = os.urandom(4).hex()
+_versions: dict[str, str] = {}
+
+# Responses that include interest accrued up to "now" change without any
+# write, so their ETag is only honoured until the next day boundary. The
+# ETag carries that time itself (`~<epoch seconds>`), so any worker can
+# check it without shared state.
+EXPIRY_SEPARATOR = "~"
+
+
+def user_scope(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def bump(*scopes: str):
+    """Invalidate every ETag derived from the given scopes, in every worker."""
+    token = os.urandom(4).hex()
+    invalidate(*(f"version:{scope}@{token}" for scope in scopes))
+
+
+def _record_bump(key: str):
+    scope, _, token = key.rpartition("@")
+    _versions[scope] = token
+
+
+def _forget_versions():
+    global _unknown
+    _unknown = os.urandom(4).hex()
+    _versions.clear()
+
+
+register("version", _record_bump, _forget_versions)
+
+
+def _resource_key(request: Request, scopes: tuple[str, ...]) -> str:
+    # Each negotiated representation of a resource gets its own ETag
+    format_, layout = negotiate(request)
+    return f"{request.url.path}?{request.url.query}#{','.join(scopes)};{format_}/{layout}"
+
+
+def _make_etag(resource: str, scopes: tuple[str, ...]) -> str:
+    versions = "-".join(_versions.get(scope, _unknown) for scope in scopes)
+    return f'W/"{zlib.crc32(resource.encode()):08x}-{versions}"'
+
+
+def not_modified(request: Request, response: Response, *scopes: str, expires: bool = False) -> Optional[Response]:
+    """
+    Answer a conditional GET before doing any work.
+
+    Sets the ETag for the current versions of `scopes` on `response` and
+    returns a 304 response if the client already holds it, else None.
+    With `expires`, a client's ETag is only honoured until the time
+    `valid_until` put in it. Audit the read before calling this: a 304
+    also confirms the client's copy of the data.
+    """
+    etag = _make_etag(_resource_key(request, scopes), scopes)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    candidates = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if expires:
+        now = calendar.timegm(utcnow().utctimetuple())
+        matched = next((tag for tag in candidates if _unexpired(tag, etag, now)), None)
+    else:
+        matched = etag if etag in candidates else None
+    if matched:
+        headers = {"ETag": matched, "Cache-Control": "private, no-cache"}
+        if "Vary" in response.headers:
+            headers["Vary"] = response.headers["Vary"]
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _unexpired(tag: str, etag: str, now: int) -> bool:
+    # `tag` is `etag` with an expiry still in the future, or with none
+    if tag == etag:
+        return True
+    base, separator, until = tag[:-1].rpartition(EXPIRY_SEPARATOR)
+    return bool(separator) and base == etag[:-1] and until.isdigit() and now < int(until)
+
+
+def valid_until(response: Response, when: Optional[datetime]):
+    """
+    Put in the ETag set by `not_modified(..., expires=True)` when content
+    computed from the current time next changes. None means the content
+    only changes on writes.
+    """
+    if when is not None:
+        etag = response.headers["ETag"]
+        response.headers["ETag"] = f'{etag[:-1]}{EXPIRY_SEPARATOR}{calendar.timegm(when.utctimetuple())}"'
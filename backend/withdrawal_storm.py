@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Load test: fast-forward a running server to day 90 and fire every user's withdrawal at once
+
+Run the server with CLOCK=simulated and RATE_LIMIT_ENABLED=false (one worker,
+since the simulated clock is per process), then point this at it.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+def call(base_url: str, method: str, path: str, body: dict = None, token: str = None) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        base_url + path,
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json", **({"Authorization": f"Bearer {token}"} if token else {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    status, body = call(base_url, "POST", "/auth/login", {"username": username, "password": password})
+    if status != 200:
+        raise SystemExit(f"Login as {username} failed: {status} {body}")
+    return body["access_token"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--amount", type=float, default=1000.0)
+    parser.add_argument("--withdraw-type", choices=["interest", "full"], default="interest")
+    parser.add_argument("--days", type=float, default=90, help="how far to advance the clock")
+    args = parser.parse_args()
+
+    admin = login(
+        args.url,
+        os.getenv("DEFAULT_ADMIN_USERNAME", "admin"),
+        os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123")
+    )
+    status, clock = call(args.url, "GET", "/admin/clock", token=admin)
+    if status != 200 or not clock["simulated"]:
+        raise SystemExit("The server must run with CLOCK=simulated")
+    run = f"storm{int(time.time())}"
+
+    def open_deposit(i: int) -> str:
+        username = f"{run}_{i}"
+        call(args.url, "POST", "/admin/users", {"username": username, "email": f"{username}@example.com", "password": "storm-pass"}, admin)
+        token = login(args.url, username, "storm-pass")
+        status, deposit = call(args.url, "POST", "/user/deposit", {"amount": args.amount, "proof_url": "storm"}, token)
+        if status != 200:
+            raise SystemExit(f"Deposit for {username} failed: {status} {deposit}")
+        status, body = call(args.url, "POST", f"/admin/deposits/{deposit['id']}/approve", token=admin)
+        if status != 200:
+            raise SystemExit(f"Approval for {username} failed: {status} {body}")
+        return token
+
+    print(f"Opening {args.users} approved deposits...")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        tokens = list(pool.map(open_deposit, range(args.users)))
+
+    status, clock = call(args.url, "POST", "/admin/clock/advance", {"days": args.days}, admin)
+    print(f"Clock advanced to {clock['now']}")
+
+    def withdraw(token: str) -> tuple[int, float]:
+        started = time.perf_counter()
+        status, _ = call(args.url, "POST", "/user/withdraw", {"withdraw_type": args.withdraw_type}, token)
+        return status, time.perf_counter() - started
+
+    print(f"Firing {len(tokens)} withdrawals with {args.concurrency} concurrent clients...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(withdraw, tokens))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for _, latency in results)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    print("=" * 60)
+    print(f"{len(results)} withdrawals in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s)")
+    print(f"  Status codes: {dict(Counter(status for status, _ in results))}")
+    print(f"  Latency ms:   p50 {percentiles[49]:.1f}  p95 {percentiles[94]:.1f}  "
+          f"p99 {percentiles[98]:.1f}  max {latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { userAPI } from '../services/api';
+import { userAPI, newIdempotencyKey } from '../services/api';
 
 const UserDashboard = () => {
     const [currentDeposit, setCurrentDeposit] = useState(null);
     const [balance, setBalance] = useState(null);
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
     const [success, setSuccess] = useState('');
@@ -17,40 +19,103 @@ const UserDashboard = () => {
         proof_url: ''
     });
 
+    // Idempotency keys of submissions whose outcome is unknown, by action,
+    // so that retrying one can never apply it twice
+    const pendingKeys = useRef({});
+
+    const idempotencyKey = (action) => {
+        if (!pendingKeys.current[action]) {
+            pendingKeys.current[action] = newIdempotencyKey();
+        }
+        return pendingKeys.current[action];
+    };
+
+    const settleKey = (action, err) => {
+        // Keep the key only if the request may have gone through (no answer,
+        // a server error, or still in progress); a retry then reuses it
+        const status = err?.response?.status;
+        if (!err || (status && status < 500 && status !== 409)) {
+            delete pendingKeys.current[action];
+        }
+    };
+
+    const updateDepositForm = (changes) => {
+        // A different deposit is a new submission
+        delete pendingKeys.current.deposit;
+        setDepositForm({ ...depositForm, ...changes });
+    };
+
     const { logout, user } = useAuth();
     const navigate = useNavigate();
 
     useEffect(() => {
-        fetchCurrentDeposit();
-        fetchBalance();
-        fetchTransactions();
+        fetchDashboard();
     }, []);
 
-    const fetchCurrentDeposit = async () => {
-        try {
-            const response = await userAPI.getCurrentDeposit();
-            setCurrentDeposit(response.data);
-        } catch (err) {
-            console.error('Failed to fetch current deposit:', err);
-        }
-    };
+    // Live updates: refresh when a deposit changes instead of polling
+    useEffect(() => {
+        let source = null;
+        let retry = null;
+        let closed = false;
+
+        const connect = async () => {
+            try {
+                const response = await userAPI.getEventsToken();
+                if (closed) return;
+                let opened = false;
+                source = new EventSource(userAPI.eventsUrl(response.data.token));
+                source.onopen = () => {
+                    // Changes may have been missed while reconnecting
+                    if (opened) fetchDashboard();
+                    opened = true;
+                };
+                source.addEventListener('deposit', () => fetchDashboard());
+                source.addEventListener('resync', () => fetchDashboard());
+                source.onerror = () => {
+                    // The browser reconnects by itself, but gives up once the
+                    // server refuses the expired token: get a new one then
+                    if (source.readyState === EventSource.CLOSED) {
+                        retry = setTimeout(connect, 5000);
+                    }
+                };
+            } catch (err) {
+                console.error('Failed to open live updates:', err);
+                if (!closed) retry = setTimeout(connect, 5000);
+            }
+        };
 
-    const fetchBalance = async () => {
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            source?.close();
+        };
+    }, []);
+
+    // Deposit, balance and recent transactions in a single request
+    const fetchDashboard = async () => {
         try {
-            const response = await userAPI.getBalance();
-            setBalance(response.data);
+            const response = await userAPI.getDashboard();
+            setCurrentDeposit(response.data.deposit);
+            setBalance(response.data.balance);
+            setTransactions(response.data.recent_transactions);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (err) {
-            console.error('Failed to fetch balance:', err);
+            console.error('Failed to fetch dashboard:', err);
         }
     };
 
-    const fetchTransactions = async () => {
+    // Older transactions, one page at a time after the dashboard's latest ones
+    const loadMoreTransactions = async () => {
+        setLoadingMore(true);
         try {
-            const response = await userAPI.getTransactions();
-            setTransactions(response.data);
+            const response = await userAPI.getTransactions(nextCursor);
+            setTransactions((loaded) => [...loaded, ...response.data]);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error('Failed to fetch transactions:', err);
         }
+        setLoadingMore(false);
     };
 
     const handleSubmitDeposit = async (e) => {
@@ -63,12 +128,13 @@ const UserDashboard = () => {
             await userAPI.submitDeposit({
                 amount: parseFloat(depositForm.amount),
                 proof_url: depositForm.proof_url
-            });
+            }, idempotencyKey('deposit'));
+            settleKey('deposit');
             setSuccess('Deposit request submitted successfully! Waiting for admin approval.');
             setDepositForm({ amount: '', proof_url: '' });
-            fetchCurrentDeposit();
-            fetchBalance();
+            fetchDashboard();
         } catch (err) {
+            settleKey('deposit', err);
             setError(err.response?.data?.detail || 'Failed to submit deposit');
         }
         setLoading(false);
@@ -79,13 +145,14 @@ const UserDashboard = () => {
         setSuccess('');
         setLoading(true);
 
+        const action = `withdraw:${withdrawType}`;
         try {
-            const response = await userAPI.withdraw(withdrawType);
+            const response = await userAPI.withdraw(withdrawType, idempotencyKey(action));
+            settleKey(action);
             setSuccess(response.data.message + ` - Amount: $${response.data.amount.toFixed(2)}`);
-            fetchCurrentDeposit();
-            fetchBalance();
-            fetchTransactions();
+            fetchDashboard();
         } catch (err) {
+            settleKey(action, err);
             setError(err.response?.data?.detail || 'Failed to process withdrawal');
         }
         setLoading(false);
@@ -246,7 +313,7 @@ const UserDashboard = () => {
                                         step="0.01"
                                         min="0.01"
                                         value={depositForm.amount}
-                                        onChange={(e) => setDepositForm({ ...depositForm, amount: e.target.value })}
+                                        onChange={(e) => updateDepositForm({ amount: e.target.value })}
                                         className="input-field"
                                         placeholder="Enter amount"
                                         required
@@ -260,7 +327,7 @@ const UserDashboard = () => {
                                     <input
                                         type="text"
                                         value={depositForm.proof_url}
-                                        onChange={(e) => setDepositForm({ ...depositForm, proof_url: e.target.value })}
+                                        onChange={(e) => updateDepositForm({ proof_url: e.target.value })}
                                         className="input-field"
                                         placeholder="Enter proof document URL or path"
                                         required
@@ -341,6 +408,17 @@ const UserDashboard = () => {
                                         ))}
                                     </tbody>
                                 </table>
+                                {nextCursor && (
+                                    <div className="mt-4 text-center">
+                                        <button
+                                            onClick={loadMoreTransactions}
+                                            disabled={loadingMore}
+                                            className="btn-secondary disabled:opacity-50"
+                                        >
+                                            {loadingMore ? 'Loading...' : 'Load more'}
+                                        </button>
+                                    </div>
+                                )}
                             </div>
                         )}
                     </div>
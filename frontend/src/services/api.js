@@ -23,6 +23,19 @@ api.interceptors.request.use(
     }
 );
 
+// Idempotency-Key for a deposit or withdrawal. crypto.randomUUID only exists
+// in secure contexts (HTTPS or localhost), so fall back to getRandomValues.
+export const newIdempotencyKey = () => {
+    if (crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    bytes[6] = (bytes[6] & 0x0f) | 0x40;
+    bytes[8] = (bytes[8] & 0x3f) | 0x80;
+    const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+};
+
 // Auth API
 export const authAPI = {
     login: (username, password) =>
@@ -49,16 +62,28 @@ export const adminAPI = {
 export const userAPI = {
     getProfile: () =>
         api.get('/user/profile'),
-    submitDeposit: (depositData) =>
-        api.post('/user/deposit', depositData),
+    getDashboard: (limit = 20) =>
+        api.get('/user/dashboard', { params: { limit } }),
+    submitDeposit: (depositData, idempotencyKey) =>
+        api.post('/user/deposit', depositData, {
+            headers: { 'Idempotency-Key': idempotencyKey },
+        }),
     getCurrentDeposit: () =>
         api.get('/user/deposit/current'),
     getBalance: () =>
         api.get('/user/balance'),
-    withdraw: (withdrawType) =>
-        api.post('/user/withdraw', { withdraw_type: withdrawType }),
-    getTransactions: () =>
-        api.get('/user/transactions'),
+    withdraw: (withdrawType, idempotencyKey) =>
+        api.post('/user/withdraw', { withdraw_type: withdrawType }, {
+            headers: { 'Idempotency-Key': idempotencyKey },
+        }),
+    getTransactions: (cursor, limit = 20) =>
+        api.get('/user/transactions', { params: { limit, cursor } }),
+    // EventSource can't send the Authorization header, so the live updates
+    // stream is opened with a short-lived token in the URL
+    getEventsToken: () =>
+        api.post('/user/events/token'),
+    eventsUrl: (token) =>
+        `${API_BASE_URL}/user/events?token=${encodeURIComponent(token)}`,
 };
 
 export default api;